@@ -0,0 +1,193 @@
+"""
+Answer Pack for PIXEL BUDDY
+Precomputed answers for the GUI quick questions and a curated question
+set per rule category, so the most common questions skip RAG and the LLM
+
+Build it offline with: python answer_pack.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from query_cache import normalize_query
+
+DEFAULT_PACK_PATH = "./answer_pack.json"
+DEFAULT_QUESTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets", "answer_questions.json")
+
+
+def load_questions(path=DEFAULT_QUESTIONS_PATH) -> List[Tuple[str, str]]:
+    """
+    Curated questions as (category, question) pairs
+
+    The file has a "quick" list (the GUI buttons) and a "categories"
+    mapping of rule category -> questions.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    questions = [("quick", q) for q in data.get("quick", [])]
+    for category, items in data.get("categories", {}).items():
+        questions.extend((category, q) for q in items)
+    return questions
+
+
+def pack_version(*parts) -> str:
+    """
+    Hash of everything the answers depend on
+
+    Parts may be strings, bytes or file paths prefixed with "file:"
+    (the file's content is hashed; a missing file hashes as empty).
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str) and part.startswith("file:"):
+            try:
+                with open(part[5:], 'rb') as f:
+                    part = f.read()
+            except OSError:
+                part = b""
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()[:16]
+
+
+class AnswerPack:
+    def __init__(self, path=DEFAULT_PACK_PATH):
+        """
+        Versioned store of precomputed answers
+
+        Lookups are a dict access on the normalized question. A pack
+        whose version does not match the current one (dataset, model or
+        prompt changed) is not served until it has been rebuilt.
+
+        Args:
+            path: JSON file the pack is stored in
+        """
+        self.path = path
+        self.version = None
+        self.answers = {}  # normalized question -> answer
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, version) -> bool:
+        """Load the pack from disk; True if it exists and matches version"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Answer pack unreadable: {e}")
+            return False
+
+        if data.get("version") != version:
+            print("📦 Answer pack is stale (dataset, model or prompt changed)")
+            return False
+
+        self.set_answers(version, {item["question"]: item["answer"] for item in data.get("answers", [])})
+        print(f"📦 Answer pack: {len(self.answers)} answers loaded")
+        return True
+
+    def set_answers(self, version, answers: Dict[str, str]):
+        """Replace the served answers in one step"""
+        table = {normalize_query(question): answer for question, answer in answers.items()}
+        with self.lock:
+            self.version = version
+            self.answers = table
+
+    def __contains__(self, question: str) -> bool:
+        """True if the question has an answer (not counted as a lookup)"""
+        return normalize_query(question) in self.answers
+
+    def lookup(self, question: str) -> Optional[str]:
+        """Precomputed answer for a question, or None"""
+        answer = self.answers.get(normalize_query(question))
+        with self.lock:
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return answer
+
+    def build(self, nlp, questions: Iterable[Tuple[str, str]], version, generate=None) -> bool:
+        """
+        Generate every answer with nlp and save the pack
+
+        Context for all questions is retrieved in one batch; answers are
+        generated one at a time. Any generation error aborts the build,
+        so a pack never contains error messages.
+
+        Args:
+            nlp: NLPProcessor used for retrieval and generation
+            questions: (category, question) pairs
+            version: Version the finished pack is stored under
+            generate: generate(question, context) -> answer (default nlp.generate)
+        """
+        generate = generate or nlp.generate
+        questions = list(questions)
+        print(f"📦 Building answer pack ({len(questions)} questions)...")
+        start = time.time()
+
+        contexts = nlp.get_relevant_context_batch([q for _, q in questions])
+        items = []
+        for (category, question), context in zip(questions, contexts):
+            try:
+                answer = generate(question, context)
+            except Exception as e:
+                print(f"⚠️  Answer pack build stopped: {e}")
+                return False
+            items.append({"category": category, "question": question, "answer": answer})
+
+        data = {
+            "version": version,
+            "model": nlp.llm_name,
+            "built": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "answers": items
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+        self.set_answers(version, {item["question"]: item["answer"] for item in items})
+        print(f"✅ Answer pack built: {len(items)} answers in {time.time() - start:.1f}s")
+        return True
+
+    def stats(self):
+        """Pack size, version and hit counters"""
+        with self.lock:
+            return {
+                "size": len(self.answers),
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the PIXEL BUDDY answer pack")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild even if the pack is up to date")
+    args = parser.parse_args()
+
+    from nlp_processor import NLPProcessor
+    import yaml
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f) or {}
+    nlp_config = config.get('nlp', {})
+
+    nlp = NLPProcessor(
+        mode=nlp_config.get('mode', 'local'),
+        use_rag=nlp_config.get('use_rag', True),
+        model=nlp_config.get('model', 'llama2')
+    )
+    nlp.wait_for_rag()
+    nlp.build_answer_pack(force=args.force)
@@ -0,0 +1,193 @@
+"""
+Batch Answering for PIXEL BUDDY
+Answers every question of a JSONL file through NLPProcessor
+
+Usage:
+    python batch_answer.py questions.jsonl answers.jsonl --concurrency 4
+    python batch_answer.py questions.jsonl answers.jsonl --resume
+    python batch_answer.py questions.jsonl answers.jsonl --mock-ollama
+
+Questions are read lazily, context is retrieved for a batch of them
+at once, and LLM calls run through NLPProcessor.aprocess (at most
+--concurrency at a time). Each result is appended to the output as
+soon as it completes; --resume skips items already answered there.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from itertools import islice
+from typing import Dict, Iterator, List, Set
+
+import yaml
+
+
+def read_items(path, field="question", id_field="id") -> Iterator[Dict]:
+    """
+    Questions of a JSONL file as {"id", "question"} dicts, one line at a time
+
+    Items without an id get their line number; blank lines are skipped.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield {"id": str(record.get(id_field, line_number)), "question": record[field]}
+
+
+def completed_ids(path) -> Set[str]:
+    """Ids answered successfully in an earlier run's output"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue  # line cut off by an interrupted run
+            if result.get("ok"):
+                done.add(result["id"])
+    return done
+
+
+def batches(items, size) -> Iterator[List[Dict]]:
+    """Consecutive lists of up to size items"""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+class BatchAnswerer:
+    def __init__(self, nlp, output, concurrency=4, batch_size=16, timeout=None):
+        """
+        Answer a stream of questions with bounded concurrency
+
+        Args:
+            nlp: NLPProcessor (its max_concurrency is set to concurrency)
+            output: Open text file results are appended to
+            concurrency: LLM calls in flight at once
+            batch_size: Questions retrieved together
+            timeout: Seconds per question (None = nlp.request_timeout)
+        """
+        self.nlp = nlp
+        self.output = output
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.answered = 0
+        self.failed = 0
+
+        nlp.max_concurrency = concurrency
+
+    def retrieve(self, questions):
+        """
+        Fill the query cache with context for a batch of questions
+
+        Only questions that will reach the LLM are retrieved (no answer
+        pack hit, passes the topic filter). aprocess() then finds their
+        context in the cache.
+        """
+        pack = self.nlp.answer_pack
+        wanted = [
+            q for q in questions
+            if (pack is None or q not in pack) and self.nlp.is_soccer_related(q)
+        ]
+        if wanted:
+            self.nlp.get_relevant_context_batch(wanted)
+
+    def write(self, result):
+        """Append one result line (flushed, so a crash loses nothing finished)"""
+        self.output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.output.flush()
+
+    async def answer(self, item, retrieval_seconds):
+        """Answer one question and write its result"""
+        start = time.time()
+        result = {"id": item["id"], "question": item["question"]}
+        try:
+            result["answer"] = await self.nlp.aprocess(item["question"], timeout=self.timeout, strict=True)
+            result["ok"] = True
+            self.answered += 1
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+            result["ok"] = False
+            self.failed += 1
+        result["retrieval_seconds"] = round(retrieval_seconds, 4)
+        result["answer_seconds"] = round(time.time() - start, 3)
+        self.write(result)
+
+        status = "✅" if result["ok"] else "❌"
+        print(f"{status} [{self.answered + self.failed}] {item['id']} ({result['answer_seconds']:.2f}s)")
+
+    async def run(self, items):
+        """Answer all items; the next batch is retrieved while answers are generated"""
+        pending = set()
+        for batch in batches(items, self.batch_size):
+            # Bound the backlog of started questions
+            while len(pending) >= max(self.batch_size, 2 * self.concurrency):
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            start = time.time()
+            await asyncio.to_thread(self.retrieve, [item["question"] for item in batch])
+            retrieval_seconds = (time.time() - start) / len(batch)
+
+            for item in batch:
+                pending.add(asyncio.create_task(self.answer(item, retrieval_seconds)))
+
+        if pending:
+            await asyncio.wait(pending)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions with PIXEL BUDDY")
+    parser.add_argument("input", help="JSONL file, one question per line")
+    parser.add_argument("output", help="JSONL file results are written to")
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM calls in flight at once")
+    parser.add_argument("--batch-size", type=int, default=16, help="Questions retrieved together")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds per question (default: nlp.request_timeout)")
+    parser.add_argument("--field", default="question", help="Key holding the question")
+    parser.add_argument("--id-field", default="id", help="Key holding the item id (default: line number)")
+    parser.add_argument("--resume", action="store_true", help="Skip items already answered in the output")
+    parser.add_argument("--use-cache", action="store_true",
+                        help="Allow answers from the response cache (off: every answer is regenerated)")
+    parser.add_argument("--mock-ollama", action="store_true",
+                        help="Answer with a local mock Ollama server (see mock_ollama.py)")
+    args = parser.parse_args()
+
+    if args.mock_ollama:
+        from mock_ollama import use_mock_ollama
+        use_mock_ollama()
+
+    from nlp_processor import NLPProcessor
+
+    with open('config.yaml', 'r') as f:
+        config = yaml.safe_load(f) or {}
+    nlp_config = config.get('nlp', {})
+
+    nlp = NLPProcessor(
+        mode=nlp_config.get('mode', 'local'),
+        use_rag=nlp_config.get('use_rag', True),
+        model=nlp_config.get('model', 'llama2')
+    )
+    if not args.use_cache:
+        nlp.response_cache = None
+    nlp.wait_for_rag()
+
+    done = completed_ids(args.output) if args.resume else set()
+    if done:
+        print(f"⏩ Resuming: {len(done)} items already answered")
+    items = (item for item in read_items(args.input, args.field, args.id_field) if item["id"] not in done)
+
+    start = time.time()
+    with open(args.output, 'a' if args.resume else 'w', encoding='utf-8') as output:
+        answerer = BatchAnswerer(nlp, output, args.concurrency, args.batch_size, args.timeout)
+        asyncio.run(answerer.run(items))
+
+    print(f"\n📊 {answerer.answered} answered, {answerer.failed} failed in {time.time() - start:.1f}s")
@@ -0,0 +1,53 @@
+"""
+Cancellation for PIXEL BUDDY
+A token the front end cancels (skip button, 's' command) to stop the
+answer that is being generated
+"""
+
+from threading import Event, Lock
+
+
+class Cancelled(Exception):
+    """The request was cancelled through its token"""
+
+
+class CancellationToken:
+    def __init__(self):
+        """
+        One-shot cancellation signal, safe to use from any thread
+
+        Work that can be stopped registers a callback with on_cancel();
+        cancel() runs every callback once.
+        """
+        self._event = Event()
+        self._lock = Lock()
+        self._callbacks = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """Cancel the request (later calls do nothing)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️  Cancel callback failed: {e}")
+
+    def on_cancel(self, callback):
+        """Call callback() on cancel (right away if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
@@ -0,0 +1,114 @@
+"""
+Context Assembler for PIXEL BUDDY
+Fits retrieved chunks into a token budget for the LLM prompt
+"""
+
+import functools
+import math
+import re
+from typing import List
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+MIN_PARTIAL_TOKENS = 16
+
+
+@functools.lru_cache(maxsize=4)
+def load_tokenizer(name):
+    """Load (once) a Hugging Face tokenizer, None if unavailable"""
+    try:
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(name)
+    except Exception as e:
+        print(f"⚠️  Tokenizer '{name}' unavailable, estimating tokens: {e}")
+        return None
+
+
+class TokenCounter:
+    def __init__(self, tokenizer_name=None, chars_per_token=3.8):
+        """
+        Count prompt tokens
+
+        Uses the named tokenizer when it can be loaded, otherwise a
+        characters-per-token estimate. Counts are memoized, so the fixed
+        prompt parts are only tokenized once.
+
+        Args:
+            tokenizer_name: Hugging Face tokenizer matching the LLM (optional)
+            chars_per_token: Estimate used without a tokenizer
+        """
+        self.tokenizer = load_tokenizer(tokenizer_name) if tokenizer_name else None
+        self.chars_per_token = chars_per_token
+        self.count = functools.lru_cache(maxsize=2048)(self._count)
+
+    def _count(self, text: str) -> int:
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False))
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+class ContextAssembler:
+    def __init__(self, counter: TokenCounter, prompt_budget=1024):
+        """
+        Initialize the assembler
+
+        Args:
+            counter: TokenCounter for the target LLM
+            prompt_budget: Tokens available for the whole prompt
+        """
+        self.counter = counter
+        self.prompt_budget = prompt_budget
+        self.tokens_saved = 0
+
+    def context_budget(self, *fixed_parts: str) -> int:
+        """Tokens left for context after the fixed prompt parts"""
+        return max(0, self.prompt_budget - sum(self.counter.count(part) for part in fixed_parts))
+
+    def _truncate(self, header: str, body: str, budget: int) -> str:
+        """Keep whole sentences of body while header + body fit in budget"""
+        kept = []
+        used = self.counter.count(header)
+        for sentence in SENTENCE_SPLIT.split(body):
+            tokens = self.counter.count(sentence + " ")
+            if used + tokens > budget:
+                break
+            kept.append(sentence)
+            used += tokens
+        return header + " ".join(kept) if kept else ""
+
+    def assemble(self, blocks: List[str], budget: int, separator="\n\n") -> str:
+        """
+        Join blocks in relevance order until the budget is used
+
+        The first block that does not fit is cut at a sentence boundary
+        (if a useful part of it fits), later blocks are dropped.
+
+        Args:
+            blocks: Formatted chunks, most relevant first ("[source]\\ntext")
+            budget: Token budget for the joined context
+        """
+        kept = []
+        used = 0
+        total = sum(self.counter.count(block) for block in blocks)
+        separator_tokens = self.counter.count(separator)
+
+        for block in blocks:
+            cost = self.counter.count(block) + (separator_tokens if kept else 0)
+            if used + cost <= budget:
+                kept.append(block)
+                used += cost
+                continue
+
+            remaining = budget - used - (separator_tokens if kept else 0)
+            if remaining >= MIN_PARTIAL_TOKENS:
+                header, _, body = block.partition("\n")
+                partial = self._truncate(header + "\n", body, remaining)
+                if partial:
+                    kept.append(partial)
+                    used += self.counter.count(partial) + (separator_tokens if len(kept) > 1 else 0)
+            break
+
+        saved = max(0, total - used)
+        if saved:
+            self.tokens_saved += saved
+            print(f"✂️  Context trimmed to {used} tokens (saved {saved} of {total})")
+        return separator.join(kept)
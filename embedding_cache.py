@@ -0,0 +1,231 @@
+"""
+Embedding Cache for PIXEL BUDDY
+Persistent on-disk cache of sentence embeddings, shared by
+index building and query-time embedding
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+DEFAULT_CACHE_DIRECTORY = "./embedding_cache"
+FLUSH_EVERY = 64
+
+
+def text_hash(text: str, namespace: str = "doc") -> str:
+    """Hash used as the cache key for a piece of text"""
+    return hashlib.sha1(f"{namespace}\0{text}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, model_name, directory=DEFAULT_CACHE_DIRECTORY, max_bytes=64 * 1024 * 1024):
+        """
+        Initialize the cache for one embedding model
+
+        Vectors live in a memory-mapped float32 matrix (vectors.f32),
+        index.json maps each text hash to its row. When the matrix
+        reaches max_bytes the least recently used rows are recycled.
+
+        Args:
+            model_name: Embedding model the vectors belong to
+            directory: Root folder of the cache
+            max_bytes: Size limit of the vector matrix
+        """
+        self.model_name = model_name
+        self.directory = os.path.join(directory, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.index_path = os.path.join(self.directory, "index.json")
+        self.max_bytes = max_bytes
+
+        self.lock = threading.Lock()
+        self.dim = None
+        self.rows = 0
+        self.tick = 0
+        self.entries = {}  # hash -> [row, last_used_tick]
+        self.free_rows = []
+        self.matrix = None
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        """Open an existing cache from disk"""
+        if not (os.path.exists(self.index_path) and os.path.exists(self.vectors_path)):
+            return
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+
+            self.dim = index["dim"]
+            self.rows = index["rows"]
+            self.tick = index["tick"]
+            self.entries = index["entries"]
+
+            used = {row for row, _ in self.entries.values()}
+            self.free_rows = [row for row in range(self.rows) if row not in used]
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r+',
+                                    shape=(self.rows, self.dim))
+        except Exception as e:
+            print(f"⚠️  Embedding cache unreadable, starting fresh: {e}")
+            self.dim = None
+            self.rows = 0
+            self.entries = {}
+            self.free_rows = []
+            self.matrix = None
+
+    @property
+    def max_rows(self):
+        return max(1, self.max_bytes // (self.dim * 4))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Return the cached vectors for the given keys (missing keys are left out)"""
+        found = {}
+        with self.lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is None:
+                    self.misses += 1
+                    continue
+                self.tick += 1
+                entry[1] = self.tick
+                found[key] = np.array(self.matrix[entry[0]])
+                self.hits += 1
+        return found
+
+    def put_many(self, keys: List[str], vectors):
+        """Store vectors under the given keys"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(keys) == 0:
+            return
+
+        with self.lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+
+            for key, vector in zip(keys, vectors):
+                entry = self.entries.get(key)
+                row = entry[0] if entry else self._allocate_row()
+                self.matrix[row] = vector
+                self.tick += 1
+                self.entries[key] = [row, self.tick]
+                self._pending += 1
+
+            if self._pending >= FLUSH_EVERY:
+                self._flush_locked()
+
+    def _allocate_row(self) -> int:
+        """Find a row for a new vector, growing or evicting as needed"""
+        if not self.free_rows:
+            if self.rows < self.max_rows:
+                self._grow(min(self.max_rows, max(64, self.rows * 2)))
+            else:
+                self._evict(max(1, self.rows // 10))
+        return self.free_rows.pop()
+
+    def _grow(self, new_rows):
+        """Extend the memory-mapped matrix to new_rows rows"""
+        os.makedirs(self.directory, exist_ok=True)
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(new_rows * self.dim * 4)
+
+        self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r+',
+                                shape=(new_rows, self.dim))
+        self.free_rows.extend(range(new_rows - 1, self.rows - 1, -1))
+        self.rows = new_rows
+
+    def _evict(self, count):
+        """Drop the least recently used entries and recycle their rows"""
+        oldest = sorted(self.entries.items(), key=lambda item: item[1][1])[:count]
+        for key, (row, _) in oldest:
+            del self.entries[key]
+            self.free_rows.append(row)
+
+    def flush(self):
+        """Persist the vectors and the index"""
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self.matrix is None:
+            return
+
+        self.matrix.flush()
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "model": self.model_name,
+                "dim": self.dim,
+                "rows": self.rows,
+                "tick": self.tick,
+                "entries": self.entries
+            }, f)
+        os.replace(tmp_path, self.index_path)
+        self._pending = 0
+
+
+class CachedEmbeddings:
+    def __init__(self, embeddings, cache: EmbeddingCache):
+        """
+        Embedding function that serves repeated texts from the cache
+
+        Drop-in replacement for the wrapped langchain embeddings.
+
+        Args:
+            embeddings: Underlying embeddings (e.g. HuggingFaceEmbeddings)
+            cache: EmbeddingCache for the same model
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def _embed(self, texts: List[str], namespace: str, embed_fn) -> np.ndarray:
+        keys = [text_hash(text, namespace) for text in texts]
+        found = self.cache.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32)
+            self.cache.put_many(list(missing), vectors)
+            found.update(zip(missing, vectors))
+
+        return np.array([found[key] for key in keys], dtype=np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed document chunks"""
+        vectors = self._embed(texts, "doc", self.embeddings.embed_documents)
+        self.cache.flush()
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a user query"""
+        embed_fn = lambda texts: [self.embeddings.embed_query(t) for t in texts]
+        return self._embed([text], "query", embed_fn)[0].tolist()
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed many user queries with one model call
+
+        sentence-transformers encode queries and documents the same way,
+        so the misses go through a single embed_documents batch.
+        """
+        return self._embed(texts, "query", self.embeddings.embed_documents).tolist()
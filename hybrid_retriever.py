@@ -0,0 +1,183 @@
+"""
+Hybrid Retriever for PIXEL BUDDY
+Fuses BM25 lexical scores with dense vector scores
+"""
+
+from typing import List
+
+import numpy as np
+
+from lexical_index import LexicalIndex
+from vector_retriever import Chunk
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    """Scale scores to 0..1 (all zeros if they are constant)"""
+    spread = values.max() - values.min() if len(values) else 0.0
+    if spread <= 0:
+        return np.zeros_like(values)
+    return (values - values.min()) / spread
+
+
+class HybridRetriever:
+    def __init__(self, vectorstore, chunks: List, embed_query, embed_queries=None,
+                 mode="hybrid", alpha=0.5, lexical_shortcut=None, fetch_k=10, distances=False):
+        """
+        Initialize the hybrid retriever
+
+        Args:
+            vectorstore: Dense store (Chroma or NumpyVectorStore)
+            chunks: Indexed chunks (objects with page_content / metadata)
+            embed_query: Function returning the query embedding
+            embed_queries: Function embedding a list of queries in one call
+            mode: 'vector' (dense only), 'hybrid' (fused scores) or
+                'lexical' (BM25 only, no embedding)
+            alpha: Weight of the vector score in the fused score
+            lexical_shortcut: In hybrid mode, skip the embedding when the best
+                BM25 hit covers at least this share of the query (None = never)
+            fetch_k: Candidates taken from each side before fusion
+            distances: The store scores by distance, lower = closer (Chroma);
+                scores are negated so higher is better everywhere
+        """
+        self.vectorstore = vectorstore
+        self.chunks = chunks
+        self.embed_query = embed_query
+        self.embed_queries = embed_queries or (lambda queries: [embed_query(q) for q in queries])
+        self.mode = mode
+        self.alpha = alpha
+        self.lexical_shortcut = lexical_shortcut
+        self.fetch_k = fetch_k
+        self.distances = distances
+
+        self.lexical = None
+        if mode != "vector":
+            self.lexical = LexicalIndex([chunk.page_content for chunk in chunks])
+        self.positions = {
+            (chunk.page_content, chunk.metadata.get('source')): i
+            for i, chunk in enumerate(chunks)
+        }
+        self.vector_searches = 0
+        self.lexical_only = 0
+
+    def _position(self, doc):
+        return self.positions.get((doc.page_content, doc.metadata.get('source')))
+
+    def _similarities(self, hits):
+        """Vector hits with higher-is-better scores"""
+        if self.distances:
+            return [(doc, -score) for doc, score in hits]
+        return hits
+
+    def _vector_search(self, vector, k):
+        return self._similarities(
+            self.vectorstore.similarity_search_by_vector_with_relevance_scores(vector, k=k)
+        )
+
+    def _vector_search_batch(self, vectors, k):
+        """Vector hits for many queries, scored in one call when the store allows it"""
+        if hasattr(self.vectorstore, 'batch_search_by_vector'):
+            batched = self.vectorstore.batch_search_by_vector(vectors, k=k)
+        elif hasattr(self.vectorstore, '_collection'):
+            # Chroma: one collection query over all embeddings
+            results = self.vectorstore._collection.query(
+                query_embeddings=np.asarray(vectors, dtype=np.float32).tolist(),
+                n_results=k,
+                include=["documents", "metadatas", "distances"]
+            )
+            batched = [
+                [(Chunk(text, metadata or {}), score) for text, metadata, score in zip(texts, metadatas, scores)]
+                for texts, metadatas, scores in zip(
+                    results["documents"], results["metadatas"], results["distances"]
+                )
+            ]
+        else:
+            return [self._vector_search(vector, k) for vector in vectors]
+        return [self._similarities(hits) for hits in batched]
+
+    def _lexical_is_enough(self, query, lexical_hits):
+        """True when BM25 alone answers the query in hybrid mode"""
+        return (self.lexical_shortcut is not None and bool(lexical_hits)
+                and self.lexical.coverage(query, lexical_hits[0][0]) >= self.lexical_shortcut)
+
+    def _fuse(self, lexical_hits, vector_hits, k):
+        """Min-max normalize both score lists and combine them"""
+        candidates = {}
+        for doc, score in vector_hits:
+            i = self._position(doc)
+            if i is not None:
+                candidates[i] = [score, 0.0]
+        vector_floor = min((score for _, score in vector_hits), default=0.0)
+        for i, score in lexical_hits:
+            candidates.setdefault(i, [vector_floor, 0.0])[1] = score
+
+        if not candidates:
+            return []
+
+        ids = list(candidates)
+        vector_scores = _min_max(np.array([candidates[i][0] for i in ids], dtype=np.float32))
+        lexical_scores = _min_max(np.array([candidates[i][1] for i in ids], dtype=np.float32))
+        fused = self.alpha * vector_scores + (1 - self.alpha) * lexical_scores
+
+        order = np.argsort(-fused, kind="stable")[:k]
+        return [(self.chunks[ids[j]], float(fused[j])) for j in order]
+
+    def similarity_search_with_relevance_scores(self, query: str, k=4):
+        """Return [(chunk, fused score)] for the k best chunks"""
+        if self.mode == "vector":
+            self.vector_searches += 1
+            return self._vector_search(self.embed_query(query), k)
+
+        lexical_hits = self.lexical.search(query, k=max(k, self.fetch_k))
+
+        if self.mode == "lexical" or self._lexical_is_enough(query, lexical_hits):
+            self.lexical_only += 1
+            return [(self.chunks[i], score) for i, score in lexical_hits[:k]]
+
+        self.vector_searches += 1
+        vector_hits = self._vector_search(self.embed_query(query), max(k, self.fetch_k))
+        return self._fuse(lexical_hits, vector_hits, k)
+
+    def batch_search_with_relevance_scores(self, queries: List[str], k=4):
+        """
+        Search many queries at once
+
+        Queries that still need the dense side are embedded with one
+        embed_queries call and scored in one call when the store supports
+        it (NumpyVectorStore matrix product, Chroma collection query).
+
+        Returns:
+            One list of (chunk, score) per query, in input order
+        """
+        results = [None] * len(queries)
+        lexical = {}
+        need_vector = []
+
+        for i, query in enumerate(queries):
+            if self.mode == "vector":
+                need_vector.append(i)
+                continue
+            lexical[i] = self.lexical.search(query, k=max(k, self.fetch_k))
+            if self.mode == "lexical" or self._lexical_is_enough(query, lexical[i]):
+                self.lexical_only += 1
+                results[i] = [(self.chunks[j], score) for j, score in lexical[i][:k]]
+            else:
+                need_vector.append(i)
+
+        if need_vector:
+            fetch_k = k if self.mode == "vector" else max(k, self.fetch_k)
+            vectors = self.embed_queries([queries[i] for i in need_vector])
+            self.vector_searches += len(need_vector)
+
+            vector_hits = self._vector_search_batch(vectors, fetch_k)
+            for i, hits in zip(need_vector, vector_hits):
+                results[i] = hits if self.mode == "vector" else self._fuse(lexical[i], hits, k)
+
+        return results
+
+    def similarity_search(self, query: str, k=4):
+        """Return the k best chunks for the query"""
+        return [doc for doc, _ in self.similarity_search_with_relevance_scores(query, k)]
+
+    def batch_search(self, queries: List[str], k=4):
+        """Return the k best chunks for each query, in input order"""
+        return [[doc for doc, _ in hits] for hits in self.batch_search_with_relevance_scores(queries, k)]
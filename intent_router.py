@@ -0,0 +1,76 @@
+"""
+Intent Router for PIXEL BUDDY
+Recognizes help / skip / exit commands before a question reaches the NLP
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from topic_filter import TopicFilter
+
+HELP = "help"
+SKIP = "skip"
+EXIT = "exit"
+
+# (intent, phrases, may be asked as a question), highest priority first.
+# An utterance is a command only when it is one of these phrases, give or
+# take FILLER words at either end: "skip please" skips, "What's next for
+# Messi?" or "close range shots?" are questions.
+DEFAULT_INTENTS = [
+    (HELP, ['help', 'help me', 'commands', 'features', 'functions',
+            'show commands', 'show me the commands', 'show me your features',
+            'what are your commands', 'what are your features', 'what are your functions',
+            'how to use', 'how do i use you', 'how do you work'], False),
+    (HELP, ['what can you do', 'who are you', 'what are you',
+            'tell me about yourself', 'what is pixel buddy'], True),
+    (SKIP, ['skip', 'skip it', 'skip this', 'next', 'next question', 'stop speaking',
+            'stop talking', 'be quiet'], False),
+    (EXIT, ['exit', 'goodbye', 'bye', 'bye bye', 'quit', 'close', 'stop',
+            'close the app', 'exit the app'], False),
+]
+
+# Politeness and attention words allowed around a command
+FILLER = {'please', 'ok', 'okay', 'hey', 'hi', 'now', 'thanks', 'pixel', 'buddy', 'so', 'well', 'then'}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class IntentRouter:
+    def __init__(self, intents: List[Tuple[str, Iterable[str], bool]] = None, topic_filter=None):
+        """
+        Compile command phrases into a lookup table
+
+        Args:
+            intents: (intent, phrases, questions) in priority order;
+                questions allows the phrase to end in "?" ("What can you do?")
+            topic_filter: TopicFilter whose soccer terms veto a command
+                (default: one over the default lexicon)
+        """
+        self.phrases = {}  # token tuple -> (intent, may end in "?")
+        for name, phrases, questions in intents or DEFAULT_INTENTS:
+            for phrase in phrases:
+                self.phrases.setdefault(tuple(TOKEN_PATTERN.findall(phrase.lower())), (name, questions))
+        self.topic_filter = topic_filter or TopicFilter()
+
+    def route(self, text: str) -> Optional[str]:
+        """Intent of the utterance (HELP, SKIP, EXIT) or None for a question"""
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        match = self.phrases.get(tuple(tokens))
+        if match is None:
+            start, end = 0, len(tokens)
+            while start < end and tokens[start] in FILLER:
+                start += 1
+            while end > start and tokens[end - 1] in FILLER:
+                end -= 1
+            match = self.phrases.get(tuple(tokens[start:end]))
+        if match is None:
+            return None
+
+        name, questions = match
+        if text.rstrip().endswith("?") and not questions:
+            return None
+        # "close", "next", "stop" next to a soccer term are part of a question
+        matcher = self.topic_filter.matcher
+        if matcher.mask(text) & matcher.bits.get("soccer", 0):
+            return None
+        return name
@@ -0,0 +1,132 @@
+"""
+Lexical Index for PIXEL BUDDY
+Compact BM25 inverted index over the RAG chunks
+"""
+
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset([
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'been', 'of', 'in',
+    'on', 'at', 'to', 'for', 'by', 'with', 'and', 'or', 'it', 'its', 'this',
+    'that', 'what', 'who', 'when', 'where', 'why', 'how', 'which', 'do',
+    'does', 'did', 'can', 'me', 'about', 'tell', 'explain', 'i', 'you',
+    'from', 'as', 'if', 'there', 'their', 'they', 'he', 'she', 'his', 'her'
+])
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens without stopwords, with plural 's' stripped"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class LexicalIndex:
+    def __init__(self, texts: List[str], k1=1.5, b=0.75):
+        """
+        Build a BM25 index
+
+        Postings are stored CSR-style in flat arrays: term t owns
+        doc_ids[offsets[t]:offsets[t + 1]] and the matching impacts,
+        where each impact is the precomputed BM25 contribution
+        idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len)).
+
+        Args:
+            texts: Chunk texts (document ids are their positions)
+            k1: Term frequency saturation
+            b: Length normalization strength
+        """
+        self.num_docs = len(texts)
+        self.vocab = {}
+
+        term_postings = []
+        lengths = np.zeros(self.num_docs, dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            counts = {}
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0) + 1
+            lengths[doc_id] = sum(counts.values())
+
+            for token, tf in counts.items():
+                term_id = self.vocab.setdefault(token, len(self.vocab))
+                if term_id == len(term_postings):
+                    term_postings.append([])
+                term_postings[term_id].append((doc_id, tf))
+
+        avg_length = float(lengths.mean()) if self.num_docs else 0.0
+        self.length_norms = k1 * (1 - b + b * lengths / max(avg_length, 1e-9))
+
+        doc_freqs = np.array([len(p) for p in term_postings], dtype=np.float32)
+        self.idf = np.log(1.0 + (self.num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        self.max_idf = float(np.log(1.0 + (self.num_docs + 0.5) / 0.5))
+
+        self.offsets = np.zeros(len(term_postings) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum(doc_freqs.astype(np.int64))
+        self.doc_ids = np.empty(self.offsets[-1], dtype=np.int32)
+        self.impacts = np.empty(self.offsets[-1], dtype=np.float32)
+
+        for term_id, postings in enumerate(term_postings):
+            start = self.offsets[term_id]
+            ids = np.array([doc_id for doc_id, _ in postings], dtype=np.int32)
+            tfs = np.array([tf for _, tf in postings], dtype=np.float32)
+            self.doc_ids[start:start + len(ids)] = ids
+            self.impacts[start:start + len(ids)] = (
+                self.idf[term_id] * tfs * (k1 + 1) / (tfs + self.length_norms[ids])
+            )
+
+    def __len__(self):
+        return self.num_docs
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query"""
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        for token in set(tokenize(query)):
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            scores[self.doc_ids[start:end]] += self.impacts[start:end]
+        return scores
+
+    def coverage(self, query: str, doc_id: int) -> float:
+        """
+        Share of the query's IDF mass found in one document
+
+        Unknown query terms count with the maximum IDF, so a query about
+        something the corpus never mentions has low coverage.
+        """
+        total = 0.0
+        matched = 0.0
+        for token in set(tokenize(query)):
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                total += self.max_idf
+                continue
+            total += float(self.idf[term_id])
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            if doc_id in self.doc_ids[start:end]:
+                matched += float(self.idf[term_id])
+        return matched / total if total else 0.0
+
+    def search(self, query: str, k=4) -> List[Tuple[int, float]]:
+        """Return [(doc_id, score)] for the k best matching documents"""
+        scores = self.scores(query)
+        k = min(k, self.num_docs)
+        if k <= 0:
+            return []
+        if k < self.num_docs:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(self.num_docs)
+        best = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), float(scores[i])) for i in best if scores[i] > 0]
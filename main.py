@@ -5,12 +5,16 @@ Voice Assistant without GUI - runs in terminal/VS Code
 
 import yaml
 import sys
+import queue
 from threading import Thread, Event
 import time
 
 # Import our modules
 from stt_improved import ImprovedSpeechToText
 from nlp_processor import NLPProcessor
+from intent_router import IntentRouter, HELP, SKIP, EXIT
+from sentence_stream import SentenceSplitter
+from cancellation import CancellationToken
 from tts import TextToSpeech
 from metrics_logger import MetricsLogger  # <--- NEW IMPORT
 
@@ -25,15 +29,23 @@ class PixelBuddyConsole:
         
         # Flags
         self.skip_current = False
+        self.cancel_token = None  # Cancels the answer being generated
         self.is_speaking = False
         self.is_processing = False
         self.running = True
         
+        # help / skip / exit commands
+        self.router = IntentRouter()
+        
         # Initialize Logger
         self.logger = MetricsLogger() # <--- NEW LOGGER
         
         # Initialize components
         self.initialize_components()
+        
+        # Sentences are spoken one by one while the answer streams in
+        self.speech_queue = queue.Queue()
+        Thread(target=self.speech_worker, daemon=True).start()
     
     def initialize_components(self):
         """Initialize AI components"""
@@ -48,8 +60,10 @@ class PixelBuddyConsole:
                 mode=self.config['nlp']['mode'],
                 domain=self.config['system']['domain'],
                 use_rag=self.config['nlp']['use_rag'],
-                model=self.config['nlp']['model']
+                model=self.config['nlp']['model'],
+                logger=self.logger
             )
+            self.nlp.on_rag_ready(self.on_rag_ready)
             
             # Initialize TTS
             print("🔊 Loading Voice Output...")
@@ -65,6 +79,13 @@ class PixelBuddyConsole:
             print(f"❌ Initialization Error: {e}")
             sys.exit(1)
     
+    def on_rag_ready(self, available):
+        """Report when retrieval becomes available"""
+        if available:
+            print("\n📚 Knowledge base ready! Answers now use FIFA rules + Wikipedia.")
+        else:
+            print("\n⚠️  Knowledge base unavailable, answering without retrieval.")
+    
     def remove_emojis(self, text):
         """Remove emojis for clean voice output"""
         import re
@@ -86,26 +107,6 @@ class PixelBuddyConsole:
         clean_text = emoji_pattern.sub('', text)
         return ' '.join(clean_text.split())
     
-    def check_exit_command(self, text):
-        """Check if user wants to exit"""
-        exit_words = ['exit', 'goodbye', 'bye', 'quit', 'close', 'stop']
-        return any(word in text.lower().strip() for word in exit_words)
-    
-    def check_skip_command(self, text):
-        """Check if user wants to skip"""
-        skip_words = ['skip', 'next', 'stop speaking']
-        return any(word in text.lower().strip() for word in skip_words)
-    
-    def check_help_command(self, text):
-        """Check if user wants help/info about PIXEL BUDDY"""
-        help_keywords = [
-            'help', 'how to use', 'what can you do', 'commands',
-            'about you', 'who are you', 'what are you',
-            'how do you work', 'tell me about yourself',
-            'what is pixel buddy', 'features', 'functions'
-        ]
-        return any(keyword in text.lower().strip() for keyword in help_keywords)
-    
     def show_help(self):
         """Show help information about PIXEL BUDDY"""
         help_text = """
@@ -116,6 +117,24 @@ I'm PIXEL BUDDY, your intelligent soccer rules assistant! ⚽
 """
         return help_text
     
+    def speech_worker(self):
+        """Speak queued sentences in order"""
+        while True:
+            text = self.speech_queue.get()
+            try:
+                self.speak(text)
+            finally:
+                self.speech_queue.task_done()
+    
+    def clear_speech_queue(self):
+        """Drop sentences that have not been spoken yet"""
+        while True:
+            try:
+                self.speech_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.speech_queue.task_done()
+    
     def speak(self, text):
         """Speak text with skip support"""
         if self.skip_current:
@@ -152,6 +171,16 @@ I'm PIXEL BUDDY, your intelligent soccer rules assistant! ⚽
         finally:
             self.is_speaking = False
     
+    def listen(self):
+        """Record and transcribe; retrieval starts on the partial transcript"""
+        stt_config = self.config['stt']
+        partial_at = float(stt_config.get('partial_transcript', 0.7))
+        return self.stt.listen_and_transcribe(
+            duration=stt_config['duration'],
+            on_partial=self.nlp.prefetch if partial_at > 0 else None,
+            partial_at=partial_at
+        )
+    
     def process_voice_query(self):
         """Process voice input"""
         try:
@@ -159,7 +188,7 @@ I'm PIXEL BUDDY, your intelligent soccer rules assistant! ⚽
             
             # --- START STT TIMER ---
             start_stt = time.time()
-            text = self.stt.listen_and_transcribe(duration=self.config['stt']['duration'])
+            text = self.listen()
             stt_duration = time.time() - start_stt
             # --- END STT TIMER ---
             
@@ -170,8 +199,14 @@ I'm PIXEL BUDDY, your intelligent soccer rules assistant! ⚽
             
             print(f"📝 You said: {text} (STT took {stt_duration:.2f}s)")
             
-            # Check for help command
-            if self.check_help_command(text):
+            # Retrieval starts now, while commands are checked
+            self.nlp.prefetch(text)
+            
+            # Check for help / skip / exit commands
+            intent = self.router.route(text)
+            if intent is not None:
+                self.nlp.discard_prefetch(text)  # commands need no context
+            if intent == HELP:
                 help_text = self.show_help()
                 print(help_text)
                 summary = "I'm PIXEL BUDDY, your soccer assistant! Type 'help' anytime for more information."
@@ -179,12 +214,12 @@ I'm PIXEL BUDDY, your intelligent soccer rules assistant! ⚽
                 return
             
             # Check commands
-            if self.check_skip_command(text):
-                self.skip_current = True
+            if intent == SKIP:
+                self.skip()
                 print("⏭️  Skipping...\n")
                 return
             
-            if self.check_exit_command(text):
+            if intent == EXIT:
                 self.goodbye()
                 return
             
@@ -201,8 +236,14 @@ I'm PIXEL BUDDY, your intelligent soccer rules assistant! ⚽
         
         print(f"📝 You: {text}")
         
-        # Check for help command
-        if self.check_help_command(text):
+        # Retrieval starts now, while commands are checked
+        self.nlp.prefetch(text)
+        
+        # Check for help / skip / exit commands
+        intent = self.router.route(text)
+        if intent is not None:
+            self.nlp.discard_prefetch(text)  # commands need no context
+        if intent == HELP:
             help_text = self.show_help()
             print(help_text)
             summary = "I'm PIXEL BUDDY, your soccer assistant! Type 'help' anytime for more information."
@@ -210,61 +251,98 @@ I'm PIXEL BUDDY, your intelligent soccer rules assistant! ⚽
             return
         
         # Check commands
-        if self.check_skip_command(text):
-            self.skip_current = True
+        if intent == SKIP:
+            self.skip()
             print("⏭️  Skipping...\n")
             return
         
-        if self.check_exit_command(text):
+        if intent == EXIT:
             self.goodbye()
             return
         
         # Process query (STT time is 0 for text input)
         self.process_query(text, input_type="text", stt_time=0)
     
+    def skip(self):
+        """Stop the current answer: generation is aborted, queued speech dropped"""
+        self.skip_current = True
+        if self.cancel_token:
+            self.cancel_token.cancel()  # frees Ollama right away
+    
     def process_query(self, text, input_type="text", stt_time=0):
-        """Process query and generate response"""
+        """Answer on a worker thread, so 's' can skip while it runs"""
         if self.is_processing:
             print("⚠️  Please wait for current response...\n")
             return
         
         self.is_processing = True
         self.skip_current = False
-        
+        self.cancel_token = CancellationToken()
+        Thread(
+            target=self._process_query_thread,
+            args=(text, input_type, stt_time, self.cancel_token),
+            daemon=True
+        ).start()
+    
+    def _process_query_thread(self, text, input_type, stt_time, cancel):
+        """Process query and generate response"""
         nlp_time = 0
         tts_time = 0
+        ttft = None
+        first_audio = None
         tts_success = False
         
         try:
             print("⚙️  Thinking...")
             
             # --- START NLP TIMER ---
+            # Every finished sentence is spoken while the rest is generated
             start_nlp = time.time()
-            response = self.nlp.process(text)
+            splitter = SentenceSplitter()
+            for piece in self.nlp.process_stream(text, cancel=cancel):
+                if self.skip_current:
+                    break
+                if ttft is None:
+                    # First token: start printing the answer right away
+                    ttft = time.time() - start_nlp
+                    print("\n⚽ PIXEL BUDDY: ", end="", flush=True)
+                print(piece, end="", flush=True)
+                
+                for sentence in splitter.feed(piece):
+                    if first_audio is None:
+                        first_audio = time.time() - start_nlp
+                    self.speech_queue.put(sentence)
             nlp_time = time.time() - start_nlp
             # --- END NLP TIMER ---
             
             if self.skip_current:
-                print("⏭️  Response skipped.\n")
+                self.clear_speech_queue()
+                print("\n⏭️  Response skipped.\n")
                 self.is_processing = False
                 return
             
-            # Display response
-            print(f"\n⚽ PIXEL BUDDY: {response}")
-            print(f"   (NLP Time: {nlp_time:.2f}s)\n")
+            for sentence in splitter.flush():
+                if first_audio is None:
+                    first_audio = time.time() - start_nlp
+                self.speech_queue.put(sentence)
             
-            # Speak response
+            # Finish the streamed response
+            print(f"\n   (NLP Time: {nlp_time:.2f}s, first token after {ttft or 0:.2f}s, "
+                  f"speech after {first_audio or 0:.2f}s)\n")
+            
+            # Wait for the remaining speech
             if not self.skip_current:
                 print("🔊 Speaking...")
                 
                 # --- START TTS TIMER ---
                 start_tts = time.time()
-                self.speak(response)
+                self.speech_queue.join()
                 tts_time = time.time() - start_tts
                 tts_success = True
                 # --- END TTS TIMER ---
             
             if self.skip_current:
+                self.clear_speech_queue()
                 print("⏭️  Speech skipped.\n")
                 tts_success = False # technically skipped
             
@@ -286,14 +364,16 @@ I'm PIXEL BUDDY, your intelligent soccer rules assistant! ⚽
                     nlp_time=nlp_time,
                     tts_time=tts_time,
                     total_time=total_time,
-                    tts_success=tts_success
+                    tts_success=tts_success,
+                    ttft=ttft,
+                    time_to_first_audio=first_audio
                 )
                 print(f"📊 Metrics logged: Total time {total_time:.2f}s")
 
     def goodbye(self):
         """Say goodbye and exit"""
         self.running = False
-        self.skip_current = True
+        self.skip()
         
         goodbye_msg = "Goodbye! Thanks for using PIXEL BUDDY. See you next time!"
         print(f"\n⚽ PIXEL BUDDY: {goodbye_msg}\n")
@@ -334,7 +414,7 @@ I'm PIXEL BUDDY, your intelligent soccer rules assistant! ⚽
                     self.process_voice_query()
                 elif user_input.lower() in ['skip', 's']:
                     if self.is_processing or self.is_speaking:
-                        self.skip_current = True
+                        self.skip()
                         print("⏭️  Skipping current response/speech...\n")
                     else:
                         print("⚠️  Nothing to skip.\n")
@@ -356,6 +436,9 @@ I'm PIXEL BUDDY, your intelligent soccer rules assistant! ⚽
 
 if __name__ == "__main__":
     print("Starting console interface...")
+    if "--mock-ollama" in sys.argv:
+        from mock_ollama import use_mock_ollama
+        use_mock_ollama()
     try:
         app = PixelBuddyConsole()
         app.run()
@@ -17,6 +17,9 @@ import time
 # Import our modules
 from stt_improved import ImprovedSpeechToText
 from nlp_processor import NLPProcessor
+from intent_router import IntentRouter, HELP, SKIP, EXIT
+from sentence_stream import SentenceSplitter
+from cancellation import CancellationToken
 from tts import TextToSpeech
 from metrics_logger import MetricsLogger
 
@@ -43,7 +46,9 @@ class PixelBuddyGUI:
             except Exception as e:
                 print("TTS Worker Error:", e)
 
-            self.root.after(0, self.after_speaking)
+            # More sentences of the same answer may be queued
+            if self.tts_queue.empty():
+                self.root.after(0, self.after_speaking)
 
     def __init__(self):
         """Initialize PIXEL BUDDY GUI"""
@@ -72,11 +77,13 @@ class PixelBuddyGUI:
         self.nlp = None
         self.tts = None
         self.logger = MetricsLogger()
+        self.router = IntentRouter()
         self.is_listening = False
         self.is_processing = False
         self.is_speaking = False
         self.is_closing = False
         self.skip_current = False  # NEW: Flag to skip current response
+        self.cancel_token = None   # Cancels the answer being generated
         
         # Setup GUI
         self.setup_gui()
@@ -285,8 +292,10 @@ class PixelBuddyGUI:
                 mode=self.config['nlp']['mode'],
                 domain=self.config['system']['domain'],
                 use_rag=self.config['nlp']['use_rag'],
-                model=self.config['nlp']['model']
+                model=self.config['nlp']['model'],
+                logger=self.logger
             )
+            self.nlp.on_rag_ready(self.on_rag_ready)
             
             # Initialize TTS
             self.init_status.set("⚙️ Loading Voice Output...")
@@ -312,6 +321,13 @@ class PixelBuddyGUI:
             self.add_message("error", f"Error initializing: {str(e)}\n")
             messagebox.showerror("Initialization Error", f"Failed to initialize:\n{str(e)}\n\nPlease check:\n1. Ollama is running\n2. Dataset files exist\n3. All packages installed")
     
+    def on_rag_ready(self, available):
+        """Report when retrieval becomes available"""
+        if available:
+            self.add_message("system", "📚 Knowledge base ready! Answers now use FIFA rules + Wikipedia.\n")
+        else:
+            self.add_message("warning", "Knowledge base unavailable, answering without retrieval.\n")
+    
     def add_message(self, sender, text):
         """Add message to chat display"""
         self.chat_display.config(state="normal")
@@ -342,31 +358,21 @@ class PixelBuddyGUI:
         self.chat_display.config(state="disabled")
         self.chat_display.see("end")
     
-    def check_exit_command(self, text):
-        """Check if user wants to exit"""
-        exit_words = ['exit', 'goodbye', 'bye', 'quit', 'close', 'stop']
-        text_lower = text.lower().strip()
-        
-        return any(word in text_lower for word in exit_words)
-    
-    def check_skip_command(self, text):
-        """Check if user wants to skip"""
-        skip_words = ['skip', 'next', 'stop speaking']
-        text_lower = text.lower().strip()
-        
-        return any(word in text_lower for word in skip_words)
+    def start_buddy_message(self):
+        """Start a PIXEL BUDDY message whose text is streamed in afterwards"""
+        self.chat_display.config(state="normal")
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.chat_display.insert("end", f"[{timestamp}] ", "timestamp")
+        self.chat_display.insert("end", "⚽ PIXEL BUDDY: ", "buddy")
+        self.chat_display.config(state="disabled")
+        self.chat_display.see("end")
     
-    def check_help_command(self, text):
-        """Check if user wants help/info about PIXEL BUDDY"""
-        help_keywords = [
-            'help', 'how to use', 'what can you do', 'commands',
-            'about you', 'who are you', 'what are you',
-            'how do you work', 'tell me about yourself',
-            'what is pixel buddy', 'features', 'functions'
-        ]
-        text_lower = text.lower().strip()
-        
-        return any(keyword in text_lower for keyword in help_keywords)
+    def append_to_chat(self, text):
+        """Append streamed text to the last message"""
+        self.chat_display.config(state="normal")
+        self.chat_display.insert("end", text)
+        self.chat_display.config(state="disabled")
+        self.chat_display.see("end")
     
     def show_help(self):
         """Show help information about PIXEL BUDDY"""
@@ -429,6 +435,8 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
     
     def skip_response(self):
         self.skip_current = True
+        if self.cancel_token:
+            self.cancel_token.cancel()  # abort the LLM request, frees Ollama right away
 
         # Clear pending speech
         while not self.tts_queue.empty():
@@ -454,8 +462,14 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
         # Clear input
         self.text_input.delete(0, "end")
         
-        # Check for help command
-        if self.check_help_command(text):
+        # Retrieval starts now, while commands are checked
+        self.nlp.prefetch(text)
+        
+        # Check for help / skip / exit commands
+        intent = self.router.route(text)
+        if intent is not None:
+            self.nlp.discard_prefetch(text)  # commands need no context
+        if intent == HELP:
             self.add_message("user", text)
             help_text = self.show_help()
             self.add_message("buddy", help_text)
@@ -467,12 +481,12 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
             return
         
         # Check for skip command
-        if self.check_skip_command(text):
+        if intent == SKIP:
             self.skip_response()
             return
         
         # Check for exit command
-        if self.check_exit_command(text):
+        if intent == EXIT:
             self.add_message("user", text)
             self.goodbye_and_close()
             return
@@ -506,12 +520,22 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
         # Record in background thread
         Thread(target=self.record_and_process, daemon=True).start()
     
+    def listen(self):
+        """Record and transcribe; retrieval starts on the partial transcript"""
+        stt_config = self.config['stt']
+        partial_at = float(stt_config.get('partial_transcript', 0.7))
+        return self.stt.listen_and_transcribe(
+            duration=stt_config['duration'],
+            on_partial=self.nlp.prefetch if partial_at > 0 else None,
+            partial_at=partial_at
+        )
+    
     def record_and_process(self):
         """Record audio and process"""
         try:
             # Record
             start_stt = time.time()
-            text = self.stt.listen_and_transcribe(duration=self.config['stt']['duration'])
+            text = self.listen()
             stt_duration = time.time() - start_stt
 
             # Reset button
@@ -523,8 +547,14 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
                 self.add_message("warning", "Could not understand speech. Please try again or type your question.\n")
                 return
             
-            # Check for help command
-            if self.check_help_command(text):
+            # Retrieval starts now, while commands are checked
+            self.nlp.prefetch(text)
+            
+            # Check for help / skip / exit commands
+            intent = self.router.route(text)
+            if intent is not None:
+                self.nlp.discard_prefetch(text)  # commands need no context
+            if intent == HELP:
                 self.add_message("user", text)
                 help_text = self.show_help()
                 self.add_message("buddy", help_text)
@@ -536,12 +566,12 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
                 return
             
             # Check for skip command
-            if self.check_skip_command(text):
+            if intent == SKIP:
                 self.skip_response()
                 return
             
             # Check for exit command
-            if self.check_exit_command(text):
+            if intent == EXIT:
                 self.add_message("user", text)
                 self.goodbye_and_close()
                 return
@@ -573,7 +603,8 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
         self.init_status.set("⚙️ Thinking...")
         
         # Process in background
-        Thread(target=self._process_query_thread, args=(text, input_type, stt_duration), daemon=True).start()
+        self.cancel_token = CancellationToken()
+        Thread(target=self._process_query_thread, args=(text, input_type, stt_duration, self.cancel_token), daemon=True).start()
         
     def remove_emojis(self, text):
         """Remove all emojis from text for clean voice output"""
@@ -607,13 +638,17 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
 
     def after_speaking(self):
         self.is_speaking = False
+        if self.is_processing:
+            return  # speech caught up with generation, more sentences follow
         self.skip_btn.configure(state="disabled")
         if not self.is_closing:
             self.init_status.set("✅ Ready! Ask me about soccer!")
 
-    def _process_query_thread(self, text, input_type, stt_duration):
+    def _process_query_thread(self, text, input_type, stt_duration, cancel=None):
         """Process query in background thread"""
         nlp_time = 0
+        ttft = None
+        first_audio = None
         tts_estimated_time = 0  # Initialize variable
         
         try:
@@ -625,12 +660,33 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
             
             print(f"[DEBUG] Processing query: {text}")
             
-            # Get response from NLP
+            # Stream response from NLP into the chat as it is generated;
+            # every finished sentence goes to the TTS queue right away
+            speak = self.tts and not self.is_closing
+            splitter = SentenceSplitter()
             start_nlp = time.time()
-            response = self.nlp.process(text)
+            pieces = []
+            for piece in self.nlp.process_stream(text, cancel=cancel):
+                if self.skip_current:
+                    break
+                if ttft is None:
+                    ttft = time.time() - start_nlp
+                    self.start_buddy_message()
+                    self.init_status.set("✍️ Answering...")
+                self.append_to_chat(piece)
+                pieces.append(piece)
+                
+                if speak:
+                    for sentence in splitter.feed(piece):
+                        if first_audio is None:
+                            first_audio = time.time() - start_nlp
+                        self.speak_async(self.remove_emojis(sentence))
+            if ttft is not None:
+                self.append_to_chat("\n\n")
+            response = "".join(pieces).strip()
             nlp_time = time.time() - start_nlp
             
-            print(f"[DEBUG] Got response: {response[:100]}...")
+            print(f"[DEBUG] Got response: {response[:100]}... (first token after {ttft or 0:.2f}s)")
             
             # Check if skipped after processing
             if self.skip_current:
@@ -638,8 +694,12 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
                 self.skip_btn.configure(state="disabled")
                 return
             
-            # Show response immediately
-            self.add_message("buddy", response)
+            # Speak the last (unterminated) sentence
+            if speak:
+                for sentence in splitter.flush():
+                    if first_audio is None:
+                        first_audio = time.time() - start_nlp
+                    self.speak_async(self.remove_emojis(sentence))
             
             # Mark processing as done
             self.is_processing = False
@@ -647,25 +707,16 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
             # Update status
             if not self.is_speaking:
                 self.init_status.set("✅ Ready! Ask me about soccer!")
+                self.skip_btn.configure(state="disabled")
             
-            print(f"[DEBUG] About to speak response...")
-            
-            # ALWAYS speak response in separate thread (unless skipped)
-            if self.tts and not self.is_closing and not self.skip_current:
-                clean_response = self.remove_emojis(response)
-                print(f"[DEBUG] Clean response: {clean_response[:100]}...")
-                
+            if first_audio is not None:
                 # --- NEW: CALCULATE TTS DURATION ---
                 # Calculate seconds based on word count and configured rate
-                word_count = len(clean_response.split())
+                word_count = len(self.remove_emojis(response).split())
                 speech_rate = self.config['tts'].get('rate', 150) # Default to 150 wpm if missing
                 tts_estimated_time = (word_count / speech_rate) * 60.0
                 # -----------------------------------
-
-                # Start speech thread
-                speech_thread = Thread(target=self.speak_async, args=(clean_response,), daemon=True)
-                speech_thread.start()
-                print(f"[DEBUG] Speech thread started")
+                print(f"[DEBUG] First sentence queued for speech after {first_audio:.2f}s")
             else:
                 print(f"[DEBUG] Speech skipped")
                 self.skip_btn.configure(state="disabled")
@@ -680,8 +731,10 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
             self.skip_btn.configure(state="disabled")
 
         try:
-            # Add the estimated TTS time to the total
-            total_time = stt_duration + nlp_time + tts_estimated_time
+            # Speech starts at the first sentence and overlaps generation
+            total_time = stt_duration + nlp_time
+            if first_audio is not None:
+                total_time = stt_duration + max(nlp_time, first_audio + tts_estimated_time)
             
             if nlp_time > 0:
                 self.logger.log(
@@ -691,7 +744,9 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
                     nlp_time=nlp_time,
                     tts_time=tts_estimated_time,  # <--- NOW SAVES REAL NUMBER
                     total_time=total_time,
-                    tts_success=True
+                    tts_success=True,
+                    ttft=ttft,
+                    time_to_first_audio=first_audio
                 )
                 print(f"📊 Metrics logged: NLP {nlp_time:.2f}s, TTS {tts_estimated_time:.2f}s")
         except Exception as e:
@@ -704,6 +759,8 @@ Need anything else? Just ask! I'm here to help! 🚀⚽"""
         
         self.is_closing = True
         self.skip_current = True  # Stop any current speech
+        if self.cancel_token:
+            self.cancel_token.cancel()
         
         goodbye_msg = "Goodbye! Thanks for using PIXEL BUDDY. See you next time! ⚽"
         self.add_message("buddy", goodbye_msg)
@@ -758,6 +815,10 @@ if __name__ == "__main__":
     ╚══════════════════════════════════════════════════════════╝
     """)
     
+    if "--mock-ollama" in sys.argv:
+        from mock_ollama import use_mock_ollama
+        use_mock_ollama()
+    
     try:
         app = PixelBuddyGUI()
         app.run()
@@ -3,24 +3,64 @@ import time
 import os
 from datetime import datetime
 
+HEADER = [
+    "timestamp",
+    "input_type",        # voice / text / quick
+    "query_length",
+    "stt_time",
+    "nlp_time",
+    "tts_time",
+    "total_response_time",
+    "tts_success",
+    "time_to_first_token",  # seconds until the first streamed piece of the answer
+    "time_to_first_audio"   # seconds until the first sentence was handed to TTS
+]
+
+EVENT_HEADER = ["timestamp", "event", "detail"]
+
 class MetricsLogger:
-    def __init__(self, filename="experiment_metrics.csv"):
+    def __init__(self, filename="experiment_metrics.csv", events_filename="experiment_events.csv"):
         self.filename = filename
+        self.events_filename = events_filename
 
         # Create file with header if not exists
         if not os.path.exists(self.filename):
             with open(self.filename, "w", newline="", encoding="utf-8") as f:
                 writer = csv.writer(f)
-                writer.writerow([
-                    "timestamp",
-                    "input_type",        # voice / text / quick
-                    "query_length",
-                    "stt_time",
-                    "nlp_time",
-                    "tts_time",
-                    "total_response_time",
-                    "tts_success"
-                ])
+                writer.writerow(HEADER)
+        else:
+            self._upgrade_header()
+
+    def _upgrade_header(self):
+        """
+        Add columns introduced since the file was created
+
+        New columns are only ever appended, so older rows simply have
+        no value for them.
+        """
+        with open(self.filename, "r", newline="", encoding="utf-8") as f:
+            lines = f.readlines()
+        if not lines:
+            lines = [""]
+
+        header = next(csv.reader([lines[0]]), [])
+        if header == HEADER or header != HEADER[:len(header)]:
+            return
+
+        lines[0] = ",".join(HEADER) + "\r\n"
+        tmp_path = self.filename + ".tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp_path, self.filename)
+
+    def log_event(self, event, detail=""):
+        """Record a one-off event (e.g. a coalesced request) in the events file"""
+        new_file = not os.path.exists(self.events_filename)
+        with open(self.events_filename, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(EVENT_HEADER)
+            writer.writerow([datetime.now().strftime("%Y-%m-%d %H:%M:%S"), event, detail])
 
     def log(
         self,
@@ -30,7 +70,9 @@ class MetricsLogger:
         nlp_time,
         tts_time,
         total_time,
-        tts_success
+        tts_success,
+        ttft=None,
+        time_to_first_audio=None
     ):
         with open(self.filename, "a", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
@@ -42,5 +84,7 @@ class MetricsLogger:
                 round(nlp_time, 3),
                 round(tts_time, 3),
                 round(total_time, 3),
-                tts_success
+                tts_success,
+                round(ttft, 3) if ttft is not None else "",
+                round(time_to_first_audio, 3) if time_to_first_audio is not None else ""
             ])
@@ -0,0 +1,266 @@
+"""
+Mock Ollama for PIXEL BUDDY
+A stand-in for the Ollama HTTP API with reproducible timing, so the
+pipeline can be load- and latency-tested without a model
+
+Serves /api/chat and /api/generate (streamed NDJSON or a single JSON
+reply) and /api/tags. Time to first token, tokens per second and error
+injection are configurable.
+
+Usage:
+    python mock_ollama.py --port 11434 --ttft 0.3 --tps 25
+    python main.py --mock-ollama
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+DEFAULT_ANSWER = (
+    "A soccer match lasts 90 minutes, played in two halves of 45 minutes each. "
+    "The referee can add stoppage time at the end of each half for injuries, "
+    "substitutions and other delays. In knockout games, 30 minutes of extra time "
+    "and a penalty shoot-out can follow if the score is level."
+)
+
+# One token per word, keeping the whitespace in front of it (like LLM tokens)
+TOKEN = re.compile(r'\s*\S+')
+
+
+class MockOllama:
+    def __init__(self, host="127.0.0.1", port=0, ttft=0.2, tokens_per_second=30.0,
+                 answer=DEFAULT_ANSWER, error_rate=0.0, stream_error_rate=0.0, seed=0):
+        """
+        Mock Ollama server (runs on a background thread after start())
+
+        Args:
+            host: Interface to listen on
+            port: Port (0 = pick a free one, see url)
+            ttft: Seconds before the first token (prompt processing)
+            tokens_per_second: Generation speed after the first token
+            answer: Text every request answers with (cut at options.num_predict tokens)
+            error_rate: Share of requests answered with HTTP 500
+            stream_error_rate: Share of streamed requests that fail halfway
+            seed: Seed for error injection, so runs are repeatable
+        """
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.answer = answer
+        self.error_rate = error_rate
+        self.stream_error_rate = stream_error_rate
+        self.random = random.Random(seed)
+
+        self.lock = Lock()
+        self.requests = 0
+        self.errors = 0
+        self.disconnects = 0  # clients that closed a stream early (cancelled)
+        self.active = 0
+        self.peak_active = 0
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve on a daemon thread; returns self"""
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _roll(self, rate):
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def tokens(self, options):
+        """Answer tokens, limited by options.num_predict"""
+        tokens = TOKEN.findall(self.answer)
+        limit = (options or {}).get("num_predict")
+        if limit is not None and limit >= 0:
+            tokens = tokens[:limit]
+        return tokens
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "disconnects": self.disconnects,
+                "peak_active": self.peak_active
+            }
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive + chunked streaming, like Ollama
+
+            def log_message(self, format, *args):
+                pass  # no per-request noise on the console
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _write_chunk(self, body):
+                data = (json.dumps(body) + "\n").encode('utf-8')
+                self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path != "/api/tags":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                self._send_json(200, {"models": [{
+                    "name": "llama2:latest",
+                    "model": "llama2:latest",
+                    "modified_at": "2024-01-01T00:00:00Z",
+                    "size": 3826793677,
+                    "digest": "mock",
+                    "details": {"family": "llama", "parameter_size": "7B"}
+                }]})
+
+            def do_POST(self):
+                if self.path not in ("/api/chat", "/api/generate"):
+                    self._send_json(404, {"error": "not found"})
+                    return
+
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": "invalid JSON"})
+                    return
+
+                with mock.lock:
+                    mock.requests += 1
+                    mock.active += 1
+                    mock.peak_active = max(mock.peak_active, mock.active)
+                try:
+                    self._generate(request, chat=self.path == "/api/chat")
+                except (BrokenPipeError, ConnectionResetError):
+                    with mock.lock:
+                        mock.disconnects += 1
+                finally:
+                    with mock.lock:
+                        mock.active -= 1
+
+            def _generate(self, request, chat):
+                if not request.get("model"):
+                    self._send_json(400, {"error": "model is required"})
+                    return
+                if mock._roll(mock.error_rate):
+                    with mock.lock:
+                        mock.errors += 1
+                    self._send_json(500, {"error": "mock ollama: injected error"})
+                    return
+
+                model = request["model"]
+                start = time.time()
+
+                # An empty generate prompt only loads the model
+                if not chat and not request.get("prompt"):
+                    self._send_json(200, {"model": model, "created_at": now(), "response": "", "done": True})
+                    return
+
+                tokens = mock.tokens(request.get("options"))
+                fail_at = len(tokens) // 2 if mock._roll(mock.stream_error_rate) else None
+
+                def piece(content, done):
+                    body = {"model": model, "created_at": now(), "done": done}
+                    if chat:
+                        body["message"] = {"role": "assistant", "content": content}
+                    else:
+                        body["response"] = content
+                    return body
+
+                def final():
+                    body = piece("" if request.get("stream", True) else "".join(tokens), True)
+                    body.update({
+                        "total_duration": int((time.time() - start) * 1e9),
+                        "prompt_eval_count": 0,
+                        "eval_count": len(tokens),
+                    })
+                    return body
+
+                if not request.get("stream", True):
+                    time.sleep(mock.ttft + len(tokens) / mock.tokens_per_second)
+                    self._send_json(200, final())
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                time.sleep(mock.ttft)
+                for i, token in enumerate(tokens):
+                    if i == fail_at:
+                        with mock.lock:
+                            mock.errors += 1
+                        self._write_chunk({"error": "mock ollama: injected stream error"})
+                        break
+                    if i:
+                        time.sleep(1.0 / mock.tokens_per_second)
+                    self._write_chunk(piece(token, False))
+                else:
+                    self._write_chunk(final())
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def use_mock_ollama(**settings):
+    """
+    Start a mock server and point Ollama clients at it (OLLAMA_HOST)
+
+    Used by the --mock-ollama flag; clients created afterwards with no
+    explicit host (nlp.ollama_host: null) talk to the mock.
+    """
+    mock = MockOllama(**settings).start()
+    os.environ["OLLAMA_HOST"] = mock.url
+    print(f"🧪 Mock Ollama at {mock.url} (ttft {mock.ttft}s, {mock.tokens_per_second} tokens/s)")
+    return mock
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a mock Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--ttft", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--tps", type=float, default=30.0, help="Tokens per second")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with HTTP 500")
+    parser.add_argument("--stream-error-rate", type=float, default=0.0, help="Share of streams failing halfway")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mock = MockOllama(args.host, args.port, args.ttft, args.tps,
+                      error_rate=args.error_rate, stream_error_rate=args.stream_error_rate, seed=args.seed)
+    print(f"🧪 Mock Ollama listening on {mock.url} (Ctrl+C to stop)")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {mock.stats()}")
@@ -4,9 +4,17 @@ Only answers soccer-related questions!
 """
 
 import os
+import time
+import asyncio
+import contextlib
+import queue
+import weakref
 from dotenv import load_dotenv
 import json
 import yaml
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock, Thread
+from types import SimpleNamespace
 
 # For local LLM
 try:
@@ -16,31 +24,49 @@ except:
 
 # For API mode
 try:
-    from anthropic import Anthropic
-except:
-    pass
-
-# For RAG
-try:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain_community.vectorstores import Chroma
-    from langchain_community.embeddings import HuggingFaceEmbeddings
-    from langchain.schema import Document
+    from anthropic import Anthropic, AsyncAnthropic
 except:
     pass
 
 # Import dataset loader
 from dataset_loader import DatasetLoader
+from rag_index import RAGIndex, chunk_hash, hashes_version
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+from vector_retriever import Chunk, NumpyVectorStore
+from hybrid_retriever import HybridRetriever
+from query_cache import QueryCache, normalize_query, extends_query
+from response_cache import ResponseCache
+from context_assembler import TokenCounter, ContextAssembler
+from topic_filter import TopicFilter, CentroidClassifier, LexiconWatcher, load_lexicon, DEFAULT_LEXICON_PATH
+from cancellation import Cancelled
+from text_chunker import iter_document_chunks, LANGCHAIN_SEPARATORS, SENTENCE_SEPARATORS
+from answer_pack import AnswerPack, load_questions, pack_version, DEFAULT_PACK_PATH, DEFAULT_QUESTIONS_PATH
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+API_MODEL = "claude-sonnet-4-20250514"
+
+TIMEOUT_MESSAGE = "Sorry, that took too long. Please try asking again."
+REJECTION_MESSAGE = "Sorry, I'm not an expert in other fields, but I am an expert in soccer rules and soccer knowledge! Please ask me questions about soccer, football rules, players, teams, or tournaments."
+
+class GenerationError(RuntimeError):
+    """The LLM call failed (raised by aprocess(strict=True))"""
+
 
 class NLPProcessor:
-    def __init__(self, mode="local", domain="soccer", use_rag=True, model="llama2"):
-        """Initialize PIXEL BUDDY with topic filtering"""
+    def __init__(self, mode="local", domain="soccer", use_rag=True, model="llama2", logger=None):
+        """
+        Initialize PIXEL BUDDY with topic filtering
+        
+        Args:
+            logger: Optional MetricsLogger for events such as coalesced requests
+        """
         load_dotenv()
         
         self.mode = mode
         self.domain = domain
         self.use_rag = use_rag
         self.model = model
+        self.logger = logger
         
         print(f"⚽ Initializing PIXEL BUDDY with topic filter...")
         print(f"   Mode: {mode}")
@@ -48,27 +74,200 @@ class NLPProcessor:
         print(f"   RAG: {use_rag}")
         print(f"   Model: {model}")
         
+        self.config = self.load_config()
+        nlp_config = self.config.get('nlp', {})
+        
+        # Query vectors + contexts, keyed by index version
+        self.index_version = None
+        self.query_cache = QueryCache(maxsize=nlp_config.get('query_cache_size', 256))
+        
+        # Finished answers, keyed by LLM + index version (persisted across restarts)
+        self.response_cache = None
+        if nlp_config.get('response_cache', True):
+            self.response_cache = ResponseCache(
+                path=nlp_config.get('response_cache_path', './response_cache.json'),
+                maxsize=int(nlp_config.get('response_cache_size', 512)),
+                ttl=float(nlp_config.get('response_cache_ttl', 24 * 3600)),
+                similarity=nlp_config.get('response_cache_similarity', 0.9)
+            )
+        
+        # Prompt token budget (system prompt + context + question)
+        self.max_tokens = int(nlp_config.get('max_tokens', 150))
+        self.rag_chunks = int(nlp_config.get('rag_chunks', 3))
+        context_window = int(nlp_config.get('context_window', 4096))
+        self.assembler = ContextAssembler(
+            TokenCounter(nlp_config.get('tokenizer'), nlp_config.get('chars_per_token', 3.8)),
+            prompt_budget=min(int(nlp_config.get('prompt_token_budget', 1024)),
+                              context_window - self.max_tokens)
+        )
+        self.system_prompt = self.get_system_prompt()
+        
+        # Keyword lexicon compiled once, recompiled when the file changes
+        lexicon_path = nlp_config.get('topic_lexicon', DEFAULT_LEXICON_PATH)
+        self.topic_filter = TopicFilter(load_lexicon(lexicon_path))
+        self.lexicon_watcher = None
+        reload_interval = float(nlp_config.get('topic_lexicon_reload', 2.0))
+        if reload_interval > 0:
+            self.lexicon_watcher = LexiconWatcher(
+                lexicon_path, self.topic_filter.set_lexicon, interval=reload_interval
+            ).start()
+        
+        # Optional embedding classifier, built once the embedder is loaded
+        self.topic_mode = nlp_config.get('topic_classifier', 'keyword')
+        self.topic_margin = float(nlp_config.get('topic_margin', 0.0))
+        self.topic_classifier = None
+        
+        # Speculative retrieval: starts before the topic filter has decided
+        self.speculative_retrieval = bool(nlp_config.get('speculative_retrieval', True))
+        self.speculative_coverage = float(nlp_config.get('speculative_coverage', 0.6))
+        self.retrieval_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="retrieval")
+        self._speculative = {}  # normalized text -> (normalized text retrieved for, Future of its context)
+        self._speculative_lock = Lock()
+        self.speculative_used = 0
+        self.speculative_extended = 0  # partial transcript retrievals reused for the final one
+        self.speculative_discarded = 0
+        
+        # Async requests: per-loop clients, bounded concurrency, timeouts
+        self.max_concurrency = int(nlp_config.get('max_concurrency', 4))
+        self.request_timeout = float(nlp_config.get('request_timeout', 60))
+        self._loop = None
+        self._loop_lock = Lock()
+        self._loop_states = weakref.WeakKeyDictionary()
+        self.coalesced = 0
+        
+        # Skipped answers: how many, and the generation thrown away
+        self.cancelled = 0
+        self.wasted_tokens = 0
+        self.wasted_seconds = 0.0
+        self.ollama = None
+        
         # Initialize LLM
         if mode == "api":
             self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        else:
+            self.setup_local_llm(nlp_config, context_window)
         
-        # Initialize RAG
-        if use_rag:
+        # Initialize RAG (in background so the assistant answers right away)
+        self.rag_wait_timeout = float(nlp_config.get('rag_wait_timeout', 0.0))
+        self.rag_future = Future()
+        if not use_rag:
+            self.rag_future.set_result(False)
+        elif nlp_config.get('rag_background', True):
+            print("   Knowledge base loading in background...")
+            Thread(target=self._setup_rag_background, daemon=True).start()
+        else:
             self.setup_rag()
+            self.rag_future.set_result(self.use_rag)
+        
+        # Precomputed answers for curated questions. A stale pack is rebuilt
+        # offline (python answer_pack.py) or, with answer_pack_rebuild: idle,
+        # in the background while no user request is running
+        self.answer_pack = None
+        self.answer_pack_lock = Lock()
+        if nlp_config.get('answer_pack', True):
+            self.answer_questions_path = nlp_config.get('answer_questions', DEFAULT_QUESTIONS_PATH)
+            self.answer_pack = AnswerPack(nlp_config.get('answer_pack_path', DEFAULT_PACK_PATH))
+            if not self.answer_pack.load(self.answer_pack_version()):
+                if nlp_config.get('answer_pack_rebuild', 'offline') == 'idle':
+                    self.on_rag_ready(self._rebuild_answer_pack_when_idle)
+                else:
+                    print("📦 Answer pack not served; build it with: python answer_pack.py")
         
-        self.system_prompt = self.get_system_prompt()
         print("✅ PIXEL BUDDY ready with topic filter!")
     
+    def setup_local_llm(self, nlp_config, context_window):
+        """
+        Long-lived Ollama client (one pooled HTTP connection for all requests)
+        
+        Generation options come from config: num_predict = max_tokens,
+        num_ctx = context_window, plus anything under nlp.llm_options.
+        The model is loaded and warmed up on a background thread, so the
+        first question does not pay the cold-load cost.
+        """
+        self.keep_alive = nlp_config.get('keep_alive', '30m')
+        self.llm_options = {
+            "num_predict": self.max_tokens,
+            "num_ctx": context_window,
+            **(nlp_config.get('llm_options') or {})
+        }
+        self.warmup_time = None
+        self.ollama_host = nlp_config.get('ollama_host')
+        
+        try:
+            self.ollama = ollama.Client(host=self.ollama_host)
+        except Exception as e:
+            print(f"⚠️  Ollama client unavailable: {e}")
+            return
+        
+        if nlp_config.get('preload_model', True):
+            Thread(target=self.warm_up_local, daemon=True).start()
+    
+    def warm_up_local(self):
+        """Load the model into memory and prime it with the system prompt"""
+        start = time.time()
+        try:
+            # An empty prompt only loads the weights
+            self.ollama.generate(model=self.model, prompt="", keep_alive=self.keep_alive)
+            
+            # One token through the real prompt prefix fills the prompt cache
+            self.ollama.chat(
+                model=self.model,
+                messages=[{"role": "user", "content": self.build_prompt("Hello")}],
+                options={**self.llm_options, "num_predict": 1},
+                keep_alive=self.keep_alive
+            )
+            self.warmup_time = time.time() - start
+            print(f"🔥 {self.model} loaded and warmed up ({self.warmup_time:.1f}s)")
+        except Exception as e:
+            print(f"⚠️  Could not preload {self.model}: {e}")
+    
+    def load_config(self):
+        """Load config.yaml (empty config if missing)"""
+        try:
+            with open('config.yaml', 'r') as f:
+                return yaml.safe_load(f) or {}
+        except Exception as e:
+            print(f"⚠️  Could not load config.yaml: {e}")
+            return {}
+    
+    def _setup_rag_background(self):
+        """Run setup_rag on a worker thread and resolve the readiness future"""
+        try:
+            self.setup_rag()
+            self.rag_future.set_result(self.use_rag)
+        except Exception as e:
+            self.use_rag = False
+            self.rag_future.set_exception(e)
+    
+    @property
+    def rag_ready(self):
+        """True once retrieval is available"""
+        return self.rag_future.done() and self.use_rag
+    
+    def wait_for_rag(self, timeout=None):
+        """
+        Block until RAG setup finished (or timeout seconds passed)
+        
+        Returns True if retrieval is available.
+        """
+        try:
+            return bool(self.rag_future.result(timeout=timeout))
+        except Exception:
+            return False
+    
+    def on_rag_ready(self, callback):
+        """Call callback(available) once RAG setup has finished"""
+        self.rag_future.add_done_callback(
+            lambda future: callback(not future.exception() and bool(future.result()))
+        )
+    
     def setup_rag(self):
         """Setup RAG with soccer rules + Wikipedia"""
         print("\n⚽ Setting up knowledge base...")
         
         try:
-            # Load configuration
-            with open('config.yaml', 'r') as f:
-                config = yaml.safe_load(f)
-            
-            dataset_config = config.get('datasets', {})
+            nlp_config = self.config.get('nlp', {})
+            dataset_config = self.config.get('datasets', {})
             
             # Load all datasets (local + Wikipedia)
             loader = DatasetLoader()
@@ -79,40 +278,90 @@ class NLPProcessor:
                 self.use_rag = False
                 return
             
-            # Initialize embeddings
-            print("🔄 Creating embeddings...")
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
-            )
+            retrieval_mode = nlp_config.get('retrieval_mode', 'vector')
+            backend = nlp_config.get('retriever', 'chroma')
+            self.vectorstore = None
             
-            # Create text chunks
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=500,
-                chunk_overlap=50
-            )
+            # Stream text chunks straight into the indexer (one pass, in batches)
+            separators = (LANGCHAIN_SEPARATORS if nlp_config.get('chunk_boundaries') == "langchain"
+                          else SENTENCE_SEPARATORS)
+            chunk_ids = []
+            # Hybrid fusion needs the chunks next to Chroma; the numpy store keeps its own
+            kept_chunks = [] if retrieval_mode == "hybrid" and backend != "numpy" else None
             
-            docs = []
-            for doc in knowledge_docs:
-                chunks = text_splitter.split_text(doc['content'])
-                for chunk in chunks:
-                    docs.append(Document(
-                        page_content=chunk,
-                        metadata={
-                            "source": doc.get('source', 'Unknown'),
-                            "category": doc.get('category', 'general')
-                        }
-                    ))
+            def chunks():
+                for text, metadata in iter_document_chunks(
+                    knowledge_docs,
+                    chunk_size=int(nlp_config.get('chunk_size', 500)),
+                    chunk_overlap=int(nlp_config.get('chunk_overlap', 50)),
+                    separators=separators
+                ):
+                    chunk_ids.append(chunk_hash(text, metadata))
+                    if kept_chunks is not None:
+                        kept_chunks.append(Chunk(text, metadata))
+                    yield text, metadata
             
-            # Create vector store
-            print("🔄 Building vector database...")
-            self.vectorstore = Chroma.from_documents(
-                documents=docs,
-                embedding=self.embeddings,
-                persist_directory="./chroma_db"
+            if retrieval_mode != "lexical":
+                # Initialize embeddings (langchain is only imported when needed)
+                print("🔄 Creating embeddings...")
+                from langchain_community.embeddings import HuggingFaceEmbeddings
+                self.embedding_cache = EmbeddingCache(
+                    model_name=EMBEDDING_MODEL,
+                    directory=nlp_config.get('embedding_cache_dir', './embedding_cache'),
+                    max_bytes=int(nlp_config.get('embedding_cache_mb', 64)) * 1024 * 1024
+                )
+                self.embeddings = CachedEmbeddings(
+                    HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL),
+                    self.embedding_cache
+                )
+                
+                if backend == "numpy":
+                    # In-memory matrix (unchanged chunks come from the embedding cache)
+                    print("🔄 Building in-memory vector index...")
+                    self.vectorstore = NumpyVectorStore.from_texts(
+                        chunks(), self.embeddings,
+                        precision=nlp_config.get('vector_precision', 'float32')
+                    )
+                else:
+                    # Sync vector store (only new or changed chunks get embedded)
+                    print("🔄 Syncing vector database...")
+                    self.rag_index = RAGIndex(
+                        persist_directory="./chroma_db",
+                        embedding_model=EMBEDDING_MODEL
+                    )
+                    self.vectorstore = self.rag_index.sync(chunks(), self.embeddings)
+            else:
+                # Lexical only: nothing to embed, the chunks only feed BM25
+                kept_chunks = [Chunk(text, metadata) for text, metadata in chunks()]
+            
+            if retrieval_mode != "vector":
+                print("🔄 Building lexical index...")
+            if kept_chunks is None:
+                kept_chunks = self.vectorstore.docs if backend == "numpy" else []
+            self.retriever = HybridRetriever(
+                self.vectorstore,
+                kept_chunks,
+                embed_query=self._embed_query,
+                embed_queries=self._embed_queries,
+                mode=retrieval_mode,
+                alpha=nlp_config.get('hybrid_alpha', 0.5),
+                lexical_shortcut=nlp_config.get('lexical_shortcut'),
+                distances=backend != "numpy"
             )
             
+            # New index version invalidates cached queries
+            self.index_version = hashes_version(chunk_ids)
+            self.query_cache.clear()
+            
+            if self.topic_mode != "keyword" and self.vectorstore is not None:
+                print("🔄 Building topic classifier...")
+                self.topic_classifier = CentroidClassifier(
+                    self.embeddings.embed_documents, margin=self.topic_margin
+                )
+            
             print(f"\n✅ RAG READY!")
-            print(f"   Total chunks: {len(docs)}")
+            print(f"   Total chunks: {len(chunk_ids)}")
+            print(f"   Retriever: {backend if self.vectorstore else 'none'} ({retrieval_mode})")
             print(f"   Sources: Soccer Rules + Wikipedia\n")
             
         except Exception as e:
@@ -125,80 +374,128 @@ class NLPProcessor:
         """
         Check if the query is about soccer/football
         Returns True if soccer-related, False otherwise
-        """
-        query_lower = query.lower()
         
-        # Soccer-related keywords
-        soccer_keywords = [
-            # Sport names
-            'soccer', 'football', 'futbol', 'fifa', 'uefa',
-            
-            # Rules and gameplay
-            'offside', 'penalty', 'foul', 'goal', 'kick', 'referee',
-            'card', 'yellow', 'red', 'free kick', 'corner', 'throw-in',
-            'goalkeeper', 'goalie', 'var', 'substitution',
-            
-            # Field and equipment
-            'field', 'pitch', 'ball', 'net', 'post', 'crossbar',
-            
-            # Match terms
-            'match', 'game', 'half time', 'extra time', 'stoppage',
-            'tournament', 'league', 'cup', 'championship',
-            
-            # Positions
-            'striker', 'midfielder', 'defender', 'forward', 'winger',
-            
-            # Famous tournaments
-            'world cup', 'champions league', 'premier league', 'la liga',
-            'serie a', 'bundesliga', 'euro', 'copa america',
-            
-            # Famous players (from Wikipedia topics)
-            'messi', 'ronaldo', 'pele', 'maradona', 'neymar',
-            'benzema', 'mbappe', 'haaland',
-            
-            # Tactics
-            'formation', 'tactic', 'strategy', 'defense', 'attack',
-            'counter attack', 'possession',
-            
-            # Organizations
-            'club', 'team', 'national team',
-            
-            # General
-            'play', 'player', 'coach', 'manager', 'fan'
-        ]
-        
-        # Check if any soccer keyword is in the query
-        for keyword in soccer_keywords:
-            if keyword in query_lower:
-                return True
+        nlp.topic_classifier picks the method: 'keyword' (lexicon),
+        'embedding' (centroid classifier) or 'hybrid' (keywords first,
+        the classifier for the rest). The query vector goes through the
+        query cache, so retrieval reuses it. Until the embedder is
+        loaded the keyword filter is used.
+        """
+        classifier = self.topic_classifier
+        if self.topic_mode == "keyword" or classifier is None:
+            return self.topic_filter.is_soccer_related(query)
         
-        # Additional check: if query mentions scoring, playing, winning in context
-        context_words = ['score', 'win', 'lose', 'draw', 'play']
-        for word in context_words:
-            if word in query_lower:
-                # Only consider soccer-related if other sports aren't mentioned
-                other_sports = ['basketball', 'tennis', 'cricket', 'rugby', 
-                               'baseball', 'hockey', 'volleyball', 'badminton']
-                if not any(sport in query_lower for sport in other_sports):
-                    return True
+        if self.topic_mode == "hybrid" and self.topic_filter.is_soccer_related(query):
+            return True
         
-        return False
+        try:
+            return classifier.is_soccer_related(self._embed_query(query))
+        except Exception as e:
+            print(f"⚠️  Topic classifier failed, using keywords: {e}")
+            return self.topic_filter.is_soccer_related(query)
+    
+    def _embed_query(self, query):
+        """Query embedding, served from the query cache when possible"""
+        return self.query_cache.vector(self.index_version, query, self.embeddings.embed_query)
+    
+    def _cache_embedder(self):
+        """Query embedder for paraphrase lookups, None until embeddings are loaded"""
+        if self.rag_ready and getattr(self, 'embeddings', None) is not None:
+            return self._embed_query
+        return None
     
-    def get_relevant_context(self, query, k=3):
-        """Retrieve relevant context using RAG"""
+    @property
+    def llm_name(self):
+        """Model that writes the answers"""
+        return API_MODEL if self.mode == "api" else self.model
+    
+    def _embed_queries(self, queries):
+        """Batched _embed_query: all misses go through one model call"""
+        return self.query_cache.vectors(self.index_version, queries, self.embeddings.embed_queries)
+    
+    def _format_context(self, query, docs):
+        """Join retrieved chunks with their sources, within the prompt token budget"""
+        blocks = [f"[{doc.metadata['source']}]\n{doc.page_content}" for doc in docs]
+        budget = self.assembler.context_budget(self.build_prompt(query), "Relevant Information:\n")
+        return self.assembler.assemble(blocks, budget)
+    
+    def _retrieve_context(self, query, k):
+        """Search the index and format the hits"""
+        return self._format_context(query, self.retriever.similarity_search(query, k=k))
+    
+    def _retrieve_contexts(self, queries, k):
+        """Batched _retrieve_context"""
+        return [
+            self._format_context(query, docs)
+            for query, docs in zip(queries, self.retriever.batch_search(queries, k=k))
+        ]
+    
+    def get_relevant_context(self, query, k=None):
+        """Retrieve relevant context using RAG (k defaults to nlp.rag_chunks)"""
+        k = k or self.rag_chunks
         if not self.use_rag:
             return ""
         
+        # Early queries wait up to rag_wait_timeout, then answer without context
+        if not self.rag_future.done() and not self.wait_for_rag(self.rag_wait_timeout):
+            return ""
+        
         try:
-            docs = self.vectorstore.similarity_search(query, k=k)
-            context = "\n\n".join([
-                f"[{doc.metadata['source']}]\n{doc.page_content}"
-                for doc in docs
-            ])
-            return context
+            return self.query_cache.context(self.index_version, query, k, self._retrieve_context)
         except:
             return ""
     
+    def get_relevant_context_batch(self, queries, k=None):
+        """
+        Retrieve context for many queries at once
+        
+        Uncached queries are embedded in one model call and scored
+        together. Returns one context string per query, in input order.
+        """
+        k = k or self.rag_chunks
+        if not self.use_rag:
+            return ["" for _ in queries]
+        
+        if not self.rag_future.done() and not self.wait_for_rag(self.rag_wait_timeout):
+            return ["" for _ in queries]
+        
+        try:
+            return self.query_cache.contexts(self.index_version, list(queries), k, self._retrieve_contexts)
+        except Exception as e:
+            print(f"⚠️  Batch retrieval failed: {e}")
+            return ["" for _ in queries]
+    
+    def get_stats(self):
+        """Counters for caches and retrieval"""
+        stats = {
+            "query_cache": self.query_cache.stats(),
+            "context_tokens_saved": self.assembler.tokens_saved,
+            "topic_classifier": self.topic_mode if self.topic_classifier else "keyword",
+            "coalesced_requests": self.coalesced,
+            "cancelled": {
+                "requests": self.cancelled,
+                "wasted_tokens": self.wasted_tokens,
+                "wasted_seconds": round(self.wasted_seconds, 2)
+            },
+            "speculative_retrieval": {
+                "used": self.speculative_used,
+                "from_partial": self.speculative_extended,
+                "discarded": self.speculative_discarded
+            }
+        }
+        if self.response_cache:
+            stats["response_cache"] = self.response_cache.stats()
+        if self.answer_pack:
+            stats["answer_pack"] = self.answer_pack.stats()
+        if self.mode != "api":
+            stats["llm_warmup_time"] = self.warmup_time
+        if self.use_rag and getattr(self, 'retriever', None):
+            stats["retrieval"] = {
+                "vector_searches": self.retriever.vector_searches,
+                "lexical_only": self.retriever.lexical_only
+            }
+        return stats
+    
     def get_system_prompt(self):
         """Soccer assistant system prompt"""
         return """You are PIXEL BUDDY, an intelligent soccer assistant. 
@@ -217,84 +514,602 @@ Guidelines:
 - If asked about rules, prioritize FIFA official rules
 - If asked about history/players, use Wikipedia knowledge"""
     
-    def process_with_local(self, user_input, context=""):
-        """Process using local Ollama"""
+    def build_prompt(self, user_input, context="", answer_hint="Answer (2-3 sentences):"):
+        """System prompt + retrieved context + question"""
+        prompt = self.system_prompt + "\n\n"
+        
+        if context:
+            prompt += f"Relevant Information:\n{context}\n\n"
+        
+        prompt += f"Question: {user_input}\n\n{answer_hint}"
+        return prompt
+    
+    def _generate_local(self, user_input, context=""):
+        """Raw Ollama token stream (raises on failure)"""
+        if self.ollama is None:
+            raise RuntimeError("Ollama client unavailable (is the ollama package installed?)")
+        prompt = self.build_prompt(user_input, context)
+        
+        stream = self.ollama.chat(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            options=self.llm_options,
+            keep_alive=self.keep_alive,
+            stream=True
+        )
+        
+        for part in stream:
+            yield part['message']['content']
+    
+    def _generate_api(self, user_input, context=""):
+        """Raw Claude API token stream (raises on failure)"""
+        prompt = self.build_prompt(user_input, context, "Provide a helpful answer:")
+        
+        with self.client.messages.stream(
+            model=API_MODEL,
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+    
+    def _error_message(self, error):
+        """What the user hears when generation fails"""
+        if self.mode == "api":
+            return f"Sorry, error: {str(error)}"
+        return f"Sorry, error occurred. Is Ollama running? Error: {str(error)}"
+    
+    def stream_with_local(self, user_input, context=""):
+        """Stream the answer from local Ollama, piece by piece"""
         try:
-            prompt = self.system_prompt + "\n\n"
-            
-            if context:
-                prompt += f"Relevant Information:\n{context}\n\n"
-            
-            prompt += f"Question: {user_input}\n\nAnswer (2-3 sentences):"
-            
-            response = ollama.chat(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            return response['message']['content']
-            
+            yield from self._generate_local(user_input, context)
+        except Exception as e:
+            yield self._error_message(e)
+    
+    def stream_with_api(self, user_input, context=""):
+        """Stream the answer from the Claude API, piece by piece"""
+        try:
+            yield from self._generate_api(user_input, context)
         except Exception as e:
-            return f"Sorry, error occurred. Is Ollama running? Error: {str(e)}"
+            yield self._error_message(e)
+    
+    def process_with_local(self, user_input, context=""):
+        """Process using local Ollama"""
+        return "".join(self.stream_with_local(user_input, context))
     
     def process_with_api(self, user_input, context=""):
         """Process using Claude API"""
+        return "".join(self.stream_with_api(user_input, context))
+    
+    def _generate_stream(self, user_input, context=""):
+        """Raw token stream of the configured LLM (raises on failure)"""
+        if self.mode == "api":
+            return self._generate_api(user_input, context)
+        return self._generate_local(user_input, context)
+    
+    def generate(self, user_input, context=""):
+        """Complete answer from the LLM, no filter or caches (raises on failure)"""
+        return "".join(self._generate_stream(user_input, context)).strip()
+    
+    def answer_pack_version(self):
+        """Hash of the datasets, curated questions, model, prompt and generation settings"""
+        dataset_config = self.config.get('datasets', {})
+        return pack_version(
+            self.llm_name,
+            self.system_prompt,
+            json.dumps(getattr(self, 'llm_options', None), sort_keys=True),
+            str(self.use_rag and self.rag_chunks),
+            json.dumps(dataset_config.get('wikipedia_topics', []) if dataset_config.get('enable_wikipedia') else []),
+            "file:" + self.answer_questions_path,
+            *["file:" + path for path in dataset_config.get('local_datasets', [])]
+        )
+    
+    def build_answer_pack(self, force=False, idle=False):
+        """
+        Regenerate the answer pack if it is stale (or force is set)
+        
+        Args:
+            force: Rebuild even if the pack is up to date
+            idle: Generate at lowest priority (see _agenerate_idle), for
+                builds running next to user requests
+        
+        Returns True if the pack is up to date afterwards.
+        """
+        pack = self.answer_pack
+        if pack is None:
+            return False
+        with self.answer_pack_lock:
+            version = self.answer_pack_version()
+            if pack.version == version and not force:
+                return True
+            generate = self._generate_idle if idle else None
+            return pack.build(self, load_questions(self.answer_questions_path), version, generate)
+    
+    def _rebuild_answer_pack_when_idle(self, ready):
+        """on_rag_ready callback: background rebuild, only with a working knowledge base"""
+        if not ready:
+            print("📦 Answer pack not rebuilt (knowledge base unavailable)")
+            return
+        Thread(target=self.build_answer_pack, kwargs={"idle": True}, daemon=True).start()
+    
+    def _generate_idle(self, user_input, context=""):
+        """Sync wrapper running _agenerate_idle on the event loop thread"""
+        future = asyncio.run_coroutine_threadsafe(
+            self._agenerate_idle(user_input, context), self._event_loop()
+        )
+        return future.result()
+    
+    def prefetch(self, text):
+        """
+        Start retrieval for text in the background
+        
+        Front ends call this as soon as they have a (partial) transcript,
+        before command routing; process() then picks up the result if the
+        final question has the same normalized text, or extends a partial
+        transcript that covers at least nlp.speculative_coverage of it
+        ("how long does a" -> "how long does a match last"). Results that
+        are not used (rejected question, cache hit, transcript changed)
+        are discarded. Returns the Future, or None when retrieval is off
+        or the answer pack already answers the question.
+        """
+        if not (self.use_rag and self.speculative_retrieval) or not text.strip():
+            return None
+        if self.answer_pack and text in self.answer_pack:
+            return None
+        
+        key = normalize_query(text)
+        with self._speculative_lock:
+            entry = self._speculative.get(key) or self._extended_prefetch(key)
+            if entry is None:
+                entry = (key, self.retrieval_pool.submit(self.get_relevant_context, text))
+                self._speculative[key] = entry
+                while len(self._speculative) > 8:
+                    self._speculative.pop(next(iter(self._speculative)))[1].cancel()
+                    self.speculative_discarded += 1
+        return entry[1]
+    
+    def _extended_prefetch(self, key):
+        """
+        Move the retrieval of a partial transcript that key extends to key
+        (call with _speculative_lock held); None if there is none
+        
+        Coverage is checked against the text actually retrieved for, so a
+        chain of partials never stretches one early retrieval too far.
+        """
+        partials = [k for k, (retrieved, _) in self._speculative.items()
+                    if extends_query(retrieved, key, self.speculative_coverage)]
+        if not partials:
+            return None
+        partial = max(partials, key=lambda k: len(self._speculative[k][0]))
+        entry = self._speculative[key] = self._speculative.pop(partial)
+        self.speculative_extended += 1
+        return entry
+    
+    def _claim_prefetch(self, text):
+        """
+        Take the speculative retrieval for text out of the pending ones,
+        dropping earlier partial transcripts of the same question
+        """
+        key = normalize_query(text)
+        with self._speculative_lock:
+            entry = self._speculative.pop(key, None) or self._extended_prefetch(key)
+            self._speculative.pop(key, None)
+            for partial in [k for k in self._speculative if extends_query(k, key, coverage=0)]:
+                self._speculative.pop(partial)[1].cancel()
+                self.speculative_discarded += 1
+            return entry and entry[1]
+    
+    def discard_prefetch(self, text):
+        """Drop the speculative retrieval of a question that needs no context (also commands)"""
+        future = self._claim_prefetch(text)
+        if future is not None:
+            future.cancel()
+            with self._speculative_lock:
+                self.speculative_discarded += 1
+    
+    def _prepare(self, user_input):
+        """
+        Everything before generation: topic filter, response cache, retrieval
+        
+        Returns (answer, context, version). answer is set when no LLM call
+        is needed (answer pack hit, rejected question or cache hit);
+        version is the index version the answer should be cached under.
+        """
+        # Curated question with a precomputed answer?
+        if self.answer_pack:
+            answer = self.answer_pack.lookup(user_input)
+            if answer is not None:
+                print("📦 Answer from answer pack")
+                self.discard_prefetch(user_input)
+                return answer, "", None
+        
+        # Retrieval runs while the filter and cache decide if it is needed
+        self.prefetch(user_input)
+        
+        # ===== NEW: CHECK IF QUESTION IS ABOUT SOCCER =====
+        if not self.is_soccer_related(user_input):
+            print("⚠️  Non-soccer question detected!")
+            self.discard_prefetch(user_input)
+            return REJECTION_MESSAGE, "", None
+        
+        # Question is about soccer, proceed normally
+        print("✅ Soccer-related question detected!")
+        
+        # Same (or paraphrased) question answered before?
+        version = self.index_version
+        if self.response_cache:
+            cached = self.response_cache.get(
+                self.llm_name, version, user_input, embed=self._cache_embedder()
+            )
+            if cached is not None:
+                print("⚡ Answer from response cache")
+                self.discard_prefetch(user_input)
+                return cached, "", version
+        
+        # Get relevant context
+        context = ""
+        if self.use_rag:
+            if not self.rag_future.done():
+                print("⏳ Knowledge base still loading...")
+            print("🔍 Searching knowledge base...")
+            future = self._claim_prefetch(user_input)
+            if future is not None:
+                context = future.result()
+                with self._speculative_lock:
+                    self.speculative_used += 1
+            else:
+                context = self.get_relevant_context(user_input)
+        
+        return None, context, version
+    
+    def _remember(self, user_input, version, answer):
+        """Add a completely generated answer to the response cache"""
+        if self.response_cache and answer:
+            embed = self._cache_embedder()
+            self.response_cache.put(
+                self.llm_name, version, user_input, answer,
+                vector=embed(user_input) if embed else None
+            )
+    
+    def _record_cancel(self, tokens, seconds):
+        """Count a cancelled generation and the work thrown away (pieces ~ tokens)"""
+        self.cancelled += 1
+        self.wasted_tokens += tokens
+        self.wasted_seconds += seconds
+        print(f"🛑 Generation cancelled after {tokens} tokens ({seconds:.2f}s)")
+        if self.logger:
+            self.logger.log_event("cancelled", f"tokens={tokens} seconds={seconds:.2f}")
+    
+    async def _astream(self, client, user_input, context):
+        """Token stream through the async client"""
+        if client is None:
+            raise RuntimeError("LLM client unavailable (is the ollama/anthropic package installed?)")
+        
+        if self.mode == "api":
+            async with client.messages.stream(
+                model=API_MODEL,
+                max_tokens=self.max_tokens,
+                messages=[{"role": "user", "content": self.build_prompt(user_input, context, "Provide a helpful answer:")}]
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+            return
+        
+        stream = await client.chat(
+            model=self.model,
+            messages=[{"role": "user", "content": self.build_prompt(user_input, context)}],
+            options=self.llm_options,
+            keep_alive=self.keep_alive,
+            stream=True
+        )
+        async for part in stream:
+            yield part['message']['content']
+    
+    def _stream_via_loop(self, user_input, context, cancel=None):
+        """
+        Run the async token stream on the event loop thread, yield its pieces here
+        
+        Cancelling the token (or closing this generator) cancels the
+        loop task, which closes the HTTP stream, so Ollama stops
+        generating and frees its slot right away, even before the first
+        token. Raises Cancelled when stopped through the token.
+        """
+        pieces = queue.Queue()
+        done = object()
+        
+        async def pump():
+            state = self._async_state()
+            async with self._user_slot(state):
+                async for piece in self._astream(state.client, user_input, context):
+                    pieces.put(piece)
+        
+        task = asyncio.run_coroutine_threadsafe(pump(), self._event_loop())
+        task.add_done_callback(lambda _: pieces.put(done))
+        if cancel is not None:
+            cancel.on_cancel(task.cancel)
+        try:
+            while True:
+                item = pieces.get()
+                if item is not done:
+                    yield item
+                    continue
+                if task.cancelled():
+                    raise Cancelled()
+                if task.exception() is not None:
+                    raise task.exception()
+                return
+        finally:
+            task.cancel()
+    
+    def process_stream(self, user_input, cancel=None):
+        """
+        Streaming version of process()
+        
+        Yields the answer in pieces as the LLM generates them (a rejected,
+        cached or failed query yields its message as a single piece), so
+        front ends can show text before generation has finished. Only
+        answers that were generated completely and without error are
+        added to the response cache.
+        
+        Args:
+            user_input: User question
+            cancel: Optional CancellationToken; cancelling it (or closing
+                this generator) aborts the LLM request and ends the stream
+        """
         try:
-            prompt = self.system_prompt + "\n\n"
+            answer, context, version = self._prepare(user_input)
+            if answer is not None:
+                yield answer
+                return
             
-            if context:
-                prompt += f"Relevant Information:\n{context}\n\n"
+            if cancel is not None and cancel.cancelled:
+                self._record_cancel(0, 0.0)
+                return
             
-            prompt += f"Question: {user_input}\n\nProvide a helpful answer:"
+            # Generate
+            stream = self._stream_via_loop(user_input, context, cancel)
             
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=300,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            # Leading whitespace is dropped, like strip() in process()
+            start = time.time()
+            pieces = []
+            try:
+                for piece in stream:
+                    if not pieces:
+                        piece = piece.lstrip()
+                    if piece:
+                        pieces.append(piece)
+                        yield piece
+            except Cancelled:
+                self._record_cancel(len(pieces), time.time() - start)
+                return
+            except GeneratorExit:
+                stream.close()
+                self._record_cancel(len(pieces), time.time() - start)
+                raise
+            except Exception as e:
+                print(f"❌ Generation failed: {e}")
+                yield self._error_message(e)
+                return
             
-            return message.content[0].text
+            self._remember(user_input, version, "".join(pieces).strip())
             
         except Exception as e:
-            return f"Sorry, error: {str(e)}"
+            print(f"❌ Error: {e}")
+            yield "I apologize, I encountered an error. Please try again."
     
-    def process(self, user_input):
+    def _event_loop(self):
+        """Dedicated event loop thread that runs process() requests"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                Thread(target=self._loop.run_forever, daemon=True).start()
+            return self._loop
+    
+    def _async_state(self):
         """
-        Main processing method with topic filtering
+        Async client and concurrency semaphore for the running event loop
+        
+        Both are bound to the loop they are used on, so each loop gets its own.
         """
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = SimpleNamespace(
+                semaphore=asyncio.Semaphore(self.max_concurrency),
+                client=None,
+                inflight={},  # request key -> shared computation
+                active=0,     # user requests waiting for or holding a slot
+                idle=asyncio.Event(),
+                busy=asyncio.Event()
+            )
+            state.idle.set()
+            try:
+                if self.mode == "api":
+                    state.client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+                else:
+                    state.client = ollama.AsyncClient(host=self.ollama_host)
+            except Exception as e:
+                print(f"⚠️  Async LLM client unavailable: {e}")
+            self._loop_states[loop] = state
+        return state
+    
+    @contextlib.asynccontextmanager
+    async def _user_slot(self, state):
+        """Concurrency slot for a user request (background work waits while any are active)"""
+        state.active += 1
+        state.idle.clear()
+        state.busy.set()
         try:
-            # ===== NEW: CHECK IF QUESTION IS ABOUT SOCCER =====
-            if not self.is_soccer_related(user_input):
-                print("⚠️  Non-soccer question detected!")
-                return "Sorry, I'm not an expert in other fields, but I am an expert in soccer rules and soccer knowledge! Please ask me questions about soccer, football rules, players, teams, or tournaments."
-            
-            # Question is about soccer, proceed normally
-            print("✅ Soccer-related question detected!")
-            
-            # Get relevant context
-            context = ""
-            if self.use_rag:
-                print("🔍 Searching knowledge base...")
-                context = self.get_relevant_context(user_input)
-            
-            # Process
-            if self.mode == "api":
-                response = self.process_with_api(user_input, context)
-            else:
-                response = self.process_with_local(user_input, context)
+            async with state.semaphore:
+                yield
+        finally:
+            state.active -= 1
+            if not state.active:
+                state.busy.clear()
+                state.idle.set()
+    
+    async def _agenerate_idle(self, user_input, context):
+        """
+        Generation at lowest priority (background answer pack builds)
+        
+        Waits until no user request is active, then takes a slot of the
+        same semaphore, so it never adds to max_concurrency. A user
+        request arriving meanwhile cancels the generation (freeing the
+        Ollama slot) and it is retried once the user requests are done.
+        """
+        state = self._async_state()
+        while True:
+            await state.idle.wait()
+            async with state.semaphore:
+                if not state.idle.is_set():
+                    continue
+                work = asyncio.ensure_future(self._agenerate(state.client, user_input, context))
+                interrupted = asyncio.ensure_future(state.busy.wait())
+                try:
+                    await asyncio.wait({work, interrupted}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    interrupted.cancel()
+                    if not work.done():
+                        work.cancel()
+                        await asyncio.wait({work})
+                if not work.cancelled():
+                    return work.result().strip()
+    
+    async def _agenerate(self, client, user_input, context):
+        """One non-streamed LLM call through the async client"""
+        if client is None:
+            raise RuntimeError("LLM client unavailable (is the ollama/anthropic package installed?)")
+        
+        if self.mode == "api":
+            response = await client.messages.create(
+                model=API_MODEL,
+                max_tokens=self.max_tokens,
+                messages=[{"role": "user", "content": self.build_prompt(user_input, context, "Provide a helpful answer:")}]
+            )
+            return response.content[0].text
+        
+        response = await client.chat(
+            model=self.model,
+            messages=[{"role": "user", "content": self.build_prompt(user_input, context)}],
+            options=self.llm_options,
+            keep_alive=self.keep_alive
+        )
+        return response['message']['content']
+    
+    async def _aprocess(self, user_input, state):
+        # Filter, cache and retrieval are CPU work (embeddings), done off the loop
+        answer, context, version = await asyncio.to_thread(self._prepare, user_input)
+        if answer is not None:
+            return answer
+        
+        try:
+            answer = (await self._agenerate(state.client, user_input, context)).strip()
+        except Exception as e:
+            raise GenerationError(str(e)) from e
+        
+        await asyncio.to_thread(self._remember, user_input, version, answer)
+        return answer
+    
+    def _request_key(self, user_input):
+        """Requests with the same key get the same answer"""
+        return (
+            normalize_query(user_input), self.llm_name, self.index_version,
+            self.use_rag, self.rag_chunks, json.dumps(getattr(self, 'llm_options', None), sort_keys=True)
+        )
+    
+    async def _coalesced(self, user_input, state):
+        """
+        Single-flight: identical concurrent requests share one computation
+        
+        The first request starts the work; later ones with the same key
+        wait for its result instead of starting their own retrieval and
+        generation. The work is only cancelled once every waiter gave up.
+        """
+        key = self._request_key(user_input)
+        flight = state.inflight.get(key)
+        if flight is None:
+            async def limited():
+                async with self._user_slot(state):
+                    return await self._aprocess(user_input, state)
             
-            return response.strip()
+            def landed(_):
+                if state.inflight.get(key) is flight:
+                    del state.inflight[key]
             
+            flight = SimpleNamespace(task=asyncio.ensure_future(limited()), waiters=0)
+            state.inflight[key] = flight
+            flight.task.add_done_callback(landed)
+        else:
+            self.coalesced += 1
+            print("🔗 Joined an identical request in flight")
+            if self.logger:
+                self.logger.log_event("coalesced", user_input)
+        
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if flight.waiters == 0:
+                flight.task.cancel()
+            raise
+    
+    async def aprocess(self, user_input, timeout=None, strict=False):
+        """
+        Async version of process()
+        
+        At most nlp.max_concurrency requests run at once per event loop;
+        the others wait for a free slot. Identical requests already in
+        flight are joined rather than repeated. A request that takes
+        longer than timeout seconds (waiting included, default
+        nlp.request_timeout) is cancelled, which also closes its HTTP
+        request.
+        
+        Args:
+            user_input: User question
+            timeout: Seconds before giving up (None = nlp.request_timeout, 0 = no limit)
+            strict: Raise on timeouts and errors instead of answering with an apology
+        """
+        timeout = self.request_timeout if timeout is None else timeout
+        
+        try:
+            return await asyncio.wait_for(
+                self._coalesced(user_input, self._async_state()), timeout or None
+            )
+        except asyncio.TimeoutError:
+            print(f"⏱️  Request timed out after {timeout}s")
+            if strict:
+                raise
+            return TIMEOUT_MESSAGE
+        except GenerationError as e:
+            print(f"❌ Generation failed: {e}")
+            if strict:
+                raise
+            return self._error_message(e)
         except Exception as e:
             print(f"❌ Error: {e}")
+            if strict:
+                raise
             return "I apologize, I encountered an error. Please try again."
-
+    
+    def process(self, user_input, timeout=None):
+        """
+        Main processing method with topic filtering
+        
+        Thin sync wrapper: runs aprocess() on the processor's event loop
+        thread, so concurrent callers share its concurrency limit.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.aprocess(user_input, timeout), self._event_loop()
+        )
+        return future.result()
 
 if __name__ == "__main__":
     # Test PIXEL BUDDY with topic filter
     print("Testing PIXEL BUDDY with topic filter...")
     
     nlp = NLPProcessor(mode="local", use_rag=True)
+    nlp.wait_for_rag()
     
     test_queries = [
         # Soccer questions (should answer)
@@ -314,4 +1129,6 @@ if __name__ == "__main__":
         print(f"Q: {query}")
         print(f"{'='*60}")
         response = nlp.process(query)
-        print(f"A: {response}")
\ No newline at end of file
+        print(f"A: {response}")
+    
+    print(f"\n📊 Stats: {nlp.get_stats()}")
\ No newline at end of file
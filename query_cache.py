@@ -0,0 +1,191 @@
+"""
+Query Cache for PIXEL BUDDY
+Bounded LRU cache of query embeddings and retrieved contexts
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def normalize_query(text: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r'\s+', ' ', text.lower()).strip().rstrip('?!. ')
+
+
+def extends_query(partial: str, final: str, coverage=0.6) -> bool:
+    """
+    True if final continues partial, a transcript of the first part of
+    the same utterance
+
+    Words must match; the last partial word may be cut off ("offsi" ->
+    "offside"). partial has to cover at least coverage of final's words
+    for its retrieval to stand in for the final question's.
+
+    Args:
+        partial: Normalized partial transcript
+        final: Normalized final transcript
+        coverage: Minimum share of final's words present in partial
+    """
+    partial_words, final_words = partial.split(), final.split()
+    n = len(partial_words)
+    if not n or n > len(final_words) or n < coverage * len(final_words):
+        return False
+    return (partial_words[:-1] == final_words[:n - 1]
+            and final_words[n - 1].startswith(partial_words[-1]))
+
+
+class QueryCache:
+    def __init__(self, maxsize=256):
+        """
+        Initialize the cache
+
+        Entries are keyed by (index version, normalized query) and hold
+        the query vector plus the formatted context for each k. A new
+        index version makes all older entries unreachable.
+
+        Args:
+            maxsize: Maximum number of queries kept
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.vector_hits = 0
+        self.vector_misses = 0
+        self.context_hits = 0
+        self.context_misses = 0
+
+    def _entry(self, version, query):
+        """Get (or create) the entry for a query and mark it recently used"""
+        key = (version, normalize_query(query))
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = {"vector": None, "contexts": {}, "pending": None}
+            self.entries[key] = entry
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        return entry
+
+    def vector(self, version, query, compute):
+        """
+        Return the cached query vector, computing it on a miss
+
+        Single-flight: a caller missing while the same query is already
+        being embedded (topic classifier and speculative retrieval) waits
+        for that result instead of embedding it again.
+        """
+        with self.lock:
+            entry = self._entry(version, query)
+            vector = entry["vector"]
+            if vector is not None:
+                self.vector_hits += 1
+                return vector
+            pending = entry["pending"]
+            if pending is not None:
+                self.vector_hits += 1
+            else:
+                self.vector_misses += 1
+                entry["pending"] = flight = Future()
+
+        if pending is not None:
+            return pending.result()
+
+        try:
+            vector = compute(query)
+        except BaseException as e:
+            with self.lock:
+                entry["pending"] = None
+            flight.set_exception(e)
+            raise
+        with self.lock:
+            entry["vector"] = vector
+            entry["pending"] = None
+        flight.set_result(vector)
+        return vector
+
+    def context(self, version, query, k, compute):
+        """Return the cached context string, computing it on a miss"""
+        with self.lock:
+            entry = self._entry(version, query)
+            context = entry["contexts"].get(k)
+            if context is not None:
+                self.context_hits += 1
+                return context
+            self.context_misses += 1
+
+        context = compute(query, k)
+        with self.lock:
+            entry["contexts"][k] = context
+        return context
+
+    def _lookup_many(self, version, queries, field, k=None):
+        """
+        Look up many queries at once
+
+        Returns the entries, the cached values and the misses grouped by
+        entry, so duplicate queries in a batch are only computed once.
+        """
+        results = [None] * len(queries)
+        missing = {}
+        entries = [self._entry(version, query) for query in queries]
+        for i, entry in enumerate(entries):
+            value = entry["vector"] if field == "vector" else entry["contexts"].get(k)
+            if value is not None:
+                results[i] = value
+            else:
+                missing.setdefault(id(entry), []).append(i)
+        return entries, results, list(missing.values())
+
+    def vectors(self, version, queries, compute_many):
+        """Batched vector(): misses are computed with a single compute_many call"""
+        with self.lock:
+            entries, results, groups = self._lookup_many(version, queries, "vector")
+            self.vector_misses += len(groups)
+            self.vector_hits += len(queries) - len(groups)
+
+        if groups:
+            computed = compute_many([queries[group[0]] for group in groups])
+            with self.lock:
+                for group, vector in zip(groups, computed):
+                    for i in group:
+                        entries[i]["vector"] = vector
+                        results[i] = vector
+        return results
+
+    def contexts(self, version, queries, k, compute_many):
+        """Batched context(): misses are computed with a single compute_many call"""
+        with self.lock:
+            entries, results, groups = self._lookup_many(version, queries, "contexts", k)
+            self.context_misses += len(groups)
+            self.context_hits += len(queries) - len(groups)
+
+        if groups:
+            computed = compute_many([queries[group[0]] for group in groups], k)
+            with self.lock:
+                for group, context in zip(groups, computed):
+                    for i in group:
+                        entries[i]["contexts"][k] = context
+                        results[i] = context
+        return results
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Hit/miss counters"""
+        with self.lock:
+            lookups = self.context_hits + self.context_misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "vector_hits": self.vector_hits,
+                "vector_misses": self.vector_misses,
+                "context_hits": self.context_hits,
+                "context_misses": self.context_misses,
+                "context_hit_rate": round(self.context_hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,213 @@
+"""
+Incremental RAG Index for PIXEL BUDDY
+Keeps the persisted Chroma store in sync with the knowledge base
+using a manifest of chunk content hashes
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from typing import Dict, Iterable, List, Tuple
+
+MANIFEST_FILE = "manifest.json"
+DEFAULT_PERSIST_DIRECTORY = "./chroma_db"
+
+
+def chunk_hash(text: str, metadata: Dict) -> str:
+    """
+    Content address of a chunk
+
+    Args:
+        text: Chunk text
+        metadata: Chunk metadata (source, category, ...)
+    """
+    digest = hashlib.sha1(text.encode('utf-8'))
+    for key in sorted(metadata):
+        digest.update(f"\0{key}={metadata[key]}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def index_version(chunks: Iterable[Tuple[str, Dict]]) -> str:
+    """Version id of a set of chunks (changes whenever any chunk does)"""
+    return hashes_version(chunk_hash(text, metadata) for text, metadata in chunks)
+
+
+def hashes_version(chunk_ids: Iterable[str]) -> str:
+    """index_version() from chunk hashes collected while streaming the chunks"""
+    digest = hashlib.sha1()
+    for chunk_id in sorted(chunk_ids):
+        digest.update(chunk_id.encode('ascii'))
+    return digest.hexdigest()[:12]
+
+
+class RAGIndex:
+    def __init__(self, persist_directory=DEFAULT_PERSIST_DIRECTORY, embedding_model=None):
+        """
+        Initialize the incremental index
+
+        Args:
+            persist_directory: Folder holding the Chroma store and the manifest
+            embedding_model: Name of the embedding model the store was built with
+        """
+        self.persist_directory = persist_directory
+        self.embedding_model = embedding_model
+        self.manifest_path = os.path.join(persist_directory, MANIFEST_FILE)
+
+    def load_manifest(self) -> Dict:
+        """Load the chunk manifest (empty if the index was never built)"""
+        if not os.path.exists(self.manifest_path):
+            return {"embedding_model": self.embedding_model, "chunks": {}}
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️  Could not read index manifest: {e}")
+            return {"embedding_model": self.embedding_model, "chunks": {}}
+
+    def save_manifest(self, manifest: Dict):
+        """Write the manifest atomically next to the index"""
+        os.makedirs(self.persist_directory, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    def open_store(self, embeddings=None):
+        """Open the persisted Chroma store without touching its contents"""
+        from langchain_community.vectorstores import Chroma
+
+        return Chroma(
+            embedding_function=embeddings,
+            persist_directory=self.persist_directory
+        )
+
+    def sync(self, chunks: Iterable[Tuple[str, Dict]], embeddings, batch_size=64):
+        """
+        Bring the store in line with the current chunks
+
+        Only new or changed chunks are embedded, chunks that disappeared
+        from the knowledge base are deleted, everything else is reused.
+        The chunks are read once, batch_size at a time, so a stream
+        (iter_document_chunks) is never held in memory as a whole.
+
+        Args:
+            chunks: (text, metadata) pairs, a list or a stream
+            embeddings: Embedding function used for new chunks
+            batch_size: Chunks hashed and embedded together
+        """
+        is_new_manifest = not os.path.exists(self.manifest_path)
+        manifest = self.load_manifest()
+        store = self.open_store(embeddings)
+
+        if is_new_manifest and store._collection.count() > 0:
+            print("⚠️  Existing index has no manifest, run 'python rag_index.py --compact' "
+                  "to remove duplicates")
+
+        if manifest.get("embedding_model") not in (None, self.embedding_model) and manifest["chunks"]:
+            print(f"🔄 Embedding model changed, rebuilding index...")
+            store.delete_collection()
+            store = self.open_store(embeddings)
+            manifest["chunks"] = {}
+
+        known = manifest["chunks"]
+        current = {}  # chunk id -> manifest entry
+        added = 0
+        chunks = iter(chunks)
+        while True:
+            batch = list(itertools.islice(chunks, batch_size))
+            if not batch:
+                break
+
+            new = {}
+            for text, metadata in batch:
+                chunk_id = chunk_hash(text, metadata)
+                if chunk_id in current:
+                    continue
+                current[chunk_id] = {"source": metadata.get("source", "Unknown")}
+                if chunk_id not in known:
+                    new[chunk_id] = (text, metadata)
+
+            if new:
+                if not added:
+                    print("🔄 Embedding new chunks...")
+                store.add_texts(
+                    texts=[text for text, _ in new.values()],
+                    metadatas=[metadata for _, metadata in new.values()],
+                    ids=list(new)
+                )
+                added += len(new)
+
+        stale_ids = [chunk_id for chunk_id in known if chunk_id not in current]
+        if stale_ids:
+            print(f"🗑️  Removing {len(stale_ids)} stale chunks...")
+            store.delete(ids=stale_ids)
+
+        self.save_manifest({"embedding_model": self.embedding_model, "chunks": current})
+
+        print(f"✅ Index in sync: {added} added, {len(stale_ids)} removed, "
+              f"{len(current) - added} reused")
+        return store
+
+    def compact(self):
+        """
+        Remove duplicate chunks already sitting in the store
+
+        Entries are grouped by content hash. One copy per hash is kept
+        under its content-addressed id (reusing the stored embedding),
+        every other copy is deleted.
+        """
+        store = self.open_store()
+        data = store.get(include=["embeddings", "documents", "metadatas"])
+
+        ids = data["ids"]
+        keep = {}
+        for i, (entry_id, text, metadata) in enumerate(zip(ids, data["documents"], data["metadatas"])):
+            chunk_id = chunk_hash(text, metadata or {})
+            if chunk_id not in keep or entry_id == chunk_id:
+                keep[chunk_id] = i
+
+        readd = [chunk_id for chunk_id, i in keep.items() if ids[i] != chunk_id]
+        if readd:
+            store._collection.upsert(
+                ids=readd,
+                embeddings=[data["embeddings"][keep[chunk_id]] for chunk_id in readd],
+                documents=[data["documents"][keep[chunk_id]] for chunk_id in readd],
+                metadatas=[data["metadatas"][keep[chunk_id]] for chunk_id in readd]
+            )
+
+        duplicate_ids = [entry_id for entry_id in ids if entry_id not in keep]
+        if duplicate_ids:
+            store.delete(ids=duplicate_ids)
+
+        manifest = self.load_manifest()
+        manifest["chunks"] = {
+            chunk_id: {"source": (data["metadatas"][i] or {}).get("source", "Unknown")}
+            for chunk_id, i in keep.items()
+        }
+        self.save_manifest(manifest)
+
+        removed = len(ids) - len(keep)
+        print(f"✅ Compaction complete: {len(ids)} entries -> {len(keep)} unique chunks "
+              f"({removed} duplicates removed)")
+        return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the PIXEL BUDDY RAG index")
+    parser.add_argument("--compact", action="store_true",
+                        help="Remove duplicate chunks from the persisted store")
+    parser.add_argument("--persist-directory", default=DEFAULT_PERSIST_DIRECTORY)
+    args = parser.parse_args()
+
+    index = RAGIndex(persist_directory=args.persist_directory)
+
+    if args.compact:
+        index.compact()
+    else:
+        manifest = index.load_manifest()
+        print(f"📚 Index: {args.persist_directory}")
+        print(f"   Embedding model: {manifest.get('embedding_model')}")
+        print(f"   Chunks: {len(manifest['chunks'])}")
@@ -0,0 +1,255 @@
+"""
+Response Cache for PIXEL BUDDY
+Reuses earlier answers for repeated and paraphrased questions
+"""
+
+import atexit
+import json
+import os
+import re
+import time
+from threading import Lock, RLock, Timer
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+from query_cache import normalize_query
+
+LEVELS = ("exact", "normalized", "semantic")
+
+NUMBER = re.compile(r'\d+')
+
+
+def numbers_in(text: str) -> frozenset:
+    """Numbers in a question ("2014 World Cup" and "2018 World Cup" embed almost alike)"""
+    return frozenset(NUMBER.findall(text))
+
+
+class ResponseCache:
+    def __init__(self, path="./response_cache.json", maxsize=512, ttl=24 * 3600,
+                 similarity=0.9, save_delay=2.0):
+        """
+        Initialize the cache
+
+        An answer is found in three steps: the exact question text, the
+        normalized text (case, spacing, trailing punctuation), then the
+        most similar cached question by embedding, if its cosine
+        similarity reaches the threshold and both mention the same
+        numbers. Entries belong to a scope
+        (LLM name, index version) and are only served within it.
+
+        Args:
+            path: JSON file the cache is persisted to (None = memory only)
+            maxsize: Maximum number of answers kept (least recently used go first)
+            ttl: Seconds an answer stays valid (None or 0 = no expiry)
+            similarity: Minimum cosine similarity for a semantic hit (None = off)
+            save_delay: Seconds a change waits before it is written, so a
+                burst of answers costs one write
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.similarity = similarity
+        self.save_delay = save_delay
+
+        self.lock = RLock()
+        self.entries = OrderedDict()  # (scope, normalized) -> entry
+        self.exact = {}               # (scope, question) -> (scope, normalized)
+        self._matrices = {}           # scope -> (keys, normalized vectors), rebuilt on change
+        self.hits = {level: 0 for level in LEVELS}
+        self.misses = 0
+        self._dirty = False
+        self._save_timer = None
+        self._save_lock = Lock()  # one writer at a time
+
+        self._load()
+        if self.path:
+            atexit.register(self.save)
+
+    @staticmethod
+    def _scope(model, version):
+        return f"{model}|{version}"
+
+    def _expired(self, entry, now):
+        return bool(self.ttl) and now - entry["created"] > self.ttl
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.exact.pop((key[0], entry["question"]), None)
+        self._matrices.pop(key[0], None)
+
+    def _hit(self, key, level):
+        self.entries.move_to_end(key)
+        self.hits[level] += 1
+        return self.entries[key]["response"]
+
+    def _semantic_lookup(self, scope, question, vector, now):
+        """Key of the most similar live entry in scope, if similar enough"""
+        if scope not in self._matrices:
+            keys = [key for key, entry in self.entries.items()
+                    if key[0] == scope and entry["vector"] is not None]
+            vectors = np.array([self.entries[key]["vector"] for key in keys], dtype=np.float32)
+            if len(keys):
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            self._matrices[scope] = (keys, vectors)
+
+        keys, vectors = self._matrices[scope]
+        if not keys:
+            return None
+
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = vectors @ query
+        numbers = numbers_in(question)
+        for i in np.argsort(-scores):
+            if scores[i] < self.similarity:
+                return None
+            entry = self.entries.get(keys[i])
+            if (entry is not None and not self._expired(entry, now)
+                    and numbers_in(entry["question"]) == numbers):
+                return keys[i]
+        return None
+
+    def get(self, model, version, question: str,
+            embed: Optional[Callable[[str], list]] = None) -> Optional[str]:
+        """
+        Cached answer for a question, or None
+
+        Args:
+            model: LLM that produced the answers
+            version: Knowledge base index version
+            question: User question
+            embed: Returns the question's embedding; only called when the
+                exact and normalized lookups miss (None = no semantic level)
+        """
+        scope = self._scope(model, version)
+        now = time.time()
+        with self.lock:
+            key = self.exact.get((scope, question))
+            if key in self.entries and not self._expired(self.entries[key], now):
+                return self._hit(key, "exact")
+
+            key = (scope, normalize_query(question))
+            entry = self.entries.get(key)
+            if entry is not None:
+                if not self._expired(entry, now):
+                    return self._hit(key, "normalized")
+                self._remove(key)
+
+        if embed is not None and self.similarity is not None:
+            vector = embed(question)
+            with self.lock:
+                key = self._semantic_lookup(scope, question, vector, now)
+                if key is not None:
+                    return self._hit(key, "semantic")
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, model, version, question: str, response: str, vector=None):
+        """Store an answer (only call this for answers that completed without error)"""
+        scope = self._scope(model, version)
+        key = (scope, normalize_query(question))
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = {
+                "question": question,
+                "response": response,
+                "vector": [round(float(x), 6) for x in vector] if vector is not None else None,
+                "created": time.time()
+            }
+            self.exact[(scope, question)] = key
+            self._matrices.pop(scope, None)
+            self._dirty = True
+
+            while len(self.entries) > self.maxsize:
+                self._remove(next(iter(self.entries)))
+            # Written off the answer path; atexit writes the final state
+            self._schedule_save()
+
+    def _schedule_save(self):
+        """Start the background writer unless one is already pending"""
+        if not self.path or self._save_timer is not None:
+            return
+        self._save_timer = Timer(self.save_delay, self._timed_save)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def _timed_save(self):
+        with self.lock:
+            self._save_timer = None
+        self.save()
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self.lock:
+            self.entries.clear()
+            self.exact.clear()
+            self._matrices.clear()
+            self._dirty = True
+        self.save()
+
+    def _load(self):
+        """Read persisted entries, skipping expired ones"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            for item in data.get("entries", []):
+                entry = {name: item[name] for name in ("question", "response", "vector", "created")}
+                if self._expired(entry, now):
+                    continue
+                key = (item["scope"], normalize_query(item["question"]))
+                self.entries[key] = entry
+                self.exact[(item["scope"], item["question"])] = key
+            while len(self.entries) > self.maxsize:
+                self._remove(next(iter(self.entries)))
+            print(f"💾 Response cache: {len(self.entries)} answers loaded")
+        except Exception as e:
+            print(f"⚠️  Response cache unreadable, starting fresh: {e}")
+            self.entries.clear()
+            self.exact.clear()
+
+    def save(self):
+        """
+        Persist the entries if they changed (atomic replace)
+
+        Only the snapshot is taken under the lock; serializing and
+        writing happen outside it, so lookups are not blocked.
+        """
+        if not self.path:
+            return
+        with self._save_lock:
+            with self.lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                # Entries are replaced on put, never changed in place
+                data = {"entries": [dict(entry, scope=key[0]) for key, entry in self.entries.items()]}
+            try:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                with self.lock:
+                    self._dirty = True
+                print(f"⚠️  Could not save response cache: {e}")
+
+    def stats(self):
+        """Hit counters per level and overall hit rate"""
+        with self.lock:
+            hits = sum(self.hits.values())
+            lookups = hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                **{f"{level}_hits": count for level, count in self.hits.items()},
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,64 @@
+"""
+Sentence Stream for PIXEL BUDDY
+Cuts a stream of LLM tokens into sentences as soon as each one is
+complete, so speech can start while the answer is still generated
+"""
+
+import re
+from typing import Iterable, Iterator, List
+
+# End of sentence: . ! ? (plus closing quotes/brackets) followed by whitespace, or a line break
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+
+# "Mr. Smith" or "e.g. this" do not end a sentence
+ABBREVIATIONS = frozenset(['mr', 'mrs', 'ms', 'dr', 'st', 'vs', 'etc', 'e.g', 'i.e', 'no', 'approx'])
+
+
+class SentenceSplitter:
+    def __init__(self, min_chars=20):
+        """
+        Incremental sentence splitter
+
+        Args:
+            min_chars: Shorter sentences are joined with the next one,
+                so speech is not broken into tiny fragments
+        """
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def _is_abbreviation(self, text: str, end: int) -> bool:
+        """True if the period at text[end] closes a known abbreviation"""
+        start = end
+        while start > 0 and (text[start - 1].isalpha() or text[start - 1] == '.'):
+            start -= 1
+        return text[start:end].lower() in ABBREVIATIONS
+
+    def feed(self, piece: str) -> List[str]:
+        """Add streamed text, return the sentences it completed"""
+        self.buffer += piece
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            if match.group().startswith('.') and self._is_abbreviation(self.buffer, match.start()):
+                continue
+            sentence = self.buffer[start:match.end()].strip()
+            if len(sentence) < self.min_chars:
+                continue  # keep it, joined with what follows
+            sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the stream has ended"""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return [rest] if rest else []
+
+
+def iter_sentences(pieces: Iterable[str], min_chars=20) -> Iterator[str]:
+    """Sentences of a token stream, each yielded as soon as it is complete"""
+    splitter = SentenceSplitter(min_chars)
+    for piece in pieces:
+        yield from splitter.feed(piece)
+    yield from splitter.flush()
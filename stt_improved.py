@@ -9,6 +9,8 @@ import numpy as np
 import wave
 import tempfile
 import os
+import time
+from threading import Thread
 import noisereduce as nr
 
 class ImprovedSpeechToText:
@@ -24,9 +26,16 @@ class ImprovedSpeechToText:
         self.sample_rate = 16000
         print("✅ Improved STT ready with noise reduction!")
     
-    def record_audio(self, duration=5):
+    def record_audio(self, duration=5, on_partial=None, partial_at=0.7):
         """
         Record audio with automatic gain control
+        
+        Args:
+            duration: Seconds to record
+            on_partial: Called with the transcript of the first partial_at
+                of the recording while the rest is still being recorded
+                (None = no partial transcript)
+            partial_at: Share of the recording transcribed early
         """
         print(f"🎙️  Recording for {duration} seconds... SPEAK CLEARLY!")
         
@@ -37,9 +46,18 @@ class ImprovedSpeechToText:
                 samplerate=self.sample_rate,
                 channels=1,
                 dtype=np.float32,  # Higher quality
-                blocking=True
+                blocking=on_partial is None
             )
             
+            if on_partial is not None:
+                # sd.rec fills the array as it records: transcribe what is there so far
+                time.sleep(duration * partial_at)
+                so_far = audio[:int(duration * partial_at * self.sample_rate)].copy()
+                partial = Thread(target=self.transcribe_partial, args=(so_far, on_partial), daemon=True)
+                partial.start()
+                sd.wait()
+                partial.join()  # the Whisper model is not shared between threads
+            
             # Normalize audio levels
             audio = audio / np.max(np.abs(audio))
             
@@ -80,9 +98,22 @@ class ImprovedSpeechToText:
             wf.writeframes(audio.tobytes())
         return filename
     
+    def transcribe_partial(self, audio, on_partial):
+        """Transcribe the start of a recording and pass the text on"""
+        try:
+            peak = np.max(np.abs(audio))
+            if peak == 0:
+                return
+            text = self.transcribe((audio / peak).flatten())
+            if "[" not in text:
+                print(f"📝 So far: {text}")
+                on_partial(text)
+        except Exception as e:
+            print(f"⚠️  Partial transcript failed: {e}")
+    
     def transcribe(self, audio_file):
         """
-        Transcribe audio file with better accuracy settings
+        Transcribe audio file (or float32 array) with better accuracy settings
         """
         print("🔄 Transcribing with improved accuracy...")
         
@@ -111,13 +142,16 @@ class ImprovedSpeechToText:
             print(f"❌ Transcription error: {e}")
             return "[Transcription failed]"
     
-    def listen_and_transcribe(self, duration=5):
+    def listen_and_transcribe(self, duration=5, on_partial=None, partial_at=0.7):
         """
         Complete improved STT pipeline
+        
+        on_partial/partial_at: see record_audio (e.g. NLPProcessor.prefetch,
+        so retrieval starts before the final transcript is ready)
         """
         try:
             # Record audio
-            audio = self.record_audio(duration)
+            audio = self.record_audio(duration, on_partial, partial_at)
             
             # Apply noise reduction
             print("🔄 Reducing background noise...")
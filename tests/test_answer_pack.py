@@ -0,0 +1,91 @@
+"""Test the precomputed answer pack"""
+import os
+import sys
+import tempfile
+import time
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+from answer_pack import AnswerPack, load_questions, pack_version
+
+
+class EchoLLM:
+    """Stands in for NLPProcessor: answers by repeating the question"""
+    llm_name = "echo"
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.batches = 0
+
+    def get_relevant_context_batch(self, queries):
+        self.batches += 1
+        return ["" for _ in queries]
+
+    def generate(self, question, context=""):
+        if question == self.fail_on:
+            raise RuntimeError("LLM unavailable")
+        return f"Answer to: {question}"
+
+
+print("="*60)
+print("TESTING ANSWER PACK")
+print("="*60)
+
+questions = load_questions()
+categories = {category for category, _ in questions}
+status = "✅" if ("quick", "What is offside?") in questions and len(categories) > 10 else "❌"
+print(f"{status} {len(questions)} curated questions in {len(categories)} groups")
+
+work_dir = tempfile.mkdtemp()
+dataset = os.path.join(work_dir, "rules.json")
+with open(dataset, "w") as f:
+    f.write('[{"content": "A match lasts 90 minutes"}]')
+
+version = pack_version("llama2", "prompt", "file:" + dataset)
+status = "✅" if version == pack_version("llama2", "prompt", "file:" + dataset) else "❌"
+print(f"{status} Version is stable: {version}")
+status = "✅" if version != pack_version("llama3", "prompt", "file:" + dataset) else "❌"
+print(f"{status} Other model changes the version")
+
+# Build: one retrieval batch, then every answer is stored
+path = os.path.join(work_dir, "pack.json")
+pack = AnswerPack(path)
+llm = EchoLLM()
+built = pack.build(llm, questions, version)
+status = "✅" if built and llm.batches == 1 and pack.stats()["size"] == len(questions) else "❌"
+print(f"{status} Built {pack.stats()['size']} answers with {llm.batches} retrieval batch")
+
+# Lookup is by normalized question and takes well under 10 ms
+start = time.time()
+answer = pack.lookup("  what is OFFSIDE ")
+elapsed_ms = (time.time() - start) * 1000
+status = "✅" if answer == "Answer to: What is offside?" and elapsed_ms < 10 else "❌"
+print(f"{status} Lookup in {elapsed_ms:.3f} ms: {answer}")
+status = "✅" if pack.lookup("Who won the 1930 World Cup?") is None else "❌"
+print(f"{status} Other questions miss")
+
+# Reload: served only while the version matches
+reloaded = AnswerPack(path)
+status = "✅" if reloaded.load(version) and reloaded.lookup("Tell me about VAR") else "❌"
+print(f"{status} Pack reloads from disk")
+
+with open(dataset, "w") as f:
+    f.write('[{"content": "A match lasts 95 minutes"}]')
+new_version = pack_version("llama2", "prompt", "file:" + dataset)
+stale = AnswerPack(path)
+status = "✅" if not stale.load(new_version) and stale.lookup("What is offside?") is None else "❌"
+print(f"{status} Dataset change makes the pack stale")
+
+# A failed generation leaves the old pack untouched
+failed = reloaded.build(EchoLLM(fail_on="What is VAR in soccer?"), questions, new_version)
+status = "✅" if not failed and reloaded.version == version and reloaded.load(version) else "❌"
+print(f"{status} Failed build keeps the previous pack")
+
+print("\n" + "="*60)
+print("Answer pack test complete!")
+print("="*60)
@@ -0,0 +1,101 @@
+"""Test batch answering over a JSONL file"""
+import os
+import sys
+import tempfile
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import asyncio
+import json
+
+from batch_answer import BatchAnswerer, read_items, completed_ids
+
+
+class SlowNLP:
+    """Stands in for NLPProcessor: limits concurrency like aprocess() and tracks it"""
+    answer_pack = None
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.max_concurrency = None
+        self.active = 0
+        self.peak = 0
+        self.retrieval_batches = []
+        self.semaphore = None
+
+    def is_soccer_related(self, question):
+        return "soccer" in question
+
+    def get_relevant_context_batch(self, questions):
+        self.retrieval_batches.append(len(questions))
+
+    async def aprocess(self, question, timeout=None, strict=False):
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self.semaphore:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+        if question in self.fail:
+            raise RuntimeError("LLM unavailable")
+        return f"Answer to: {question}"
+
+
+print("="*60)
+print("TESTING BATCH ANSWER")
+print("="*60)
+
+work_dir = tempfile.mkdtemp()
+input_path = os.path.join(work_dir, "questions.jsonl")
+output_path = os.path.join(work_dir, "answers.jsonl")
+with open(input_path, "w") as f:
+    for i in range(20):
+        record = {"question": f"What is soccer rule {i}?"}
+        if i % 2 == 0:
+            record["id"] = f"q{i}"
+        f.write(json.dumps(record) + "\n")
+    f.write("\n")
+    f.write(json.dumps({"id": "pasta", "question": "How do I cook pasta?"}) + "\n")
+
+items = list(read_items(input_path))
+status = "✅" if len(items) == 21 and items[0]["id"] == "q0" and items[1]["id"] == "2" else "❌"
+print(f"{status} Read {len(items)} items (ids from file or line number)")
+
+# First run: one question fails
+nlp = SlowNLP(fail=["What is soccer rule 7?"])
+with open(output_path, "w") as output:
+    answerer = BatchAnswerer(nlp, output, concurrency=3, batch_size=8)
+    asyncio.run(answerer.run(read_items(input_path)))
+
+with open(output_path) as f:
+    results = [json.loads(line) for line in f]
+status = "✅" if len(results) == 21 and answerer.failed == 1 else "❌"
+print(f"{status} {answerer.answered} answered, {answerer.failed} failed, all written")
+status = "✅" if nlp.peak <= 3 and nlp.max_concurrency == 3 else "❌"
+print(f"{status} At most {nlp.peak} questions in flight (--concurrency 3)")
+status = "✅" if nlp.retrieval_batches == [8, 8, 4] else "❌"
+print(f"{status} Retrieval batches: {nlp.retrieval_batches} (off-topic question skipped)")
+status = "✅" if all("answer_seconds" in r and "retrieval_seconds" in r for r in results) else "❌"
+print(f"{status} Per-item timings recorded")
+
+# Resume: only the failed item runs again
+done = completed_ids(output_path)
+status = "✅" if len(done) == 20 and "8" not in done else "❌"
+print(f"{status} Checkpoint: {len(done)} items done")
+
+nlp = SlowNLP()
+with open(output_path, "a") as output:
+    answerer = BatchAnswerer(nlp, output, concurrency=3)
+    asyncio.run(answerer.run(item for item in read_items(input_path) if item["id"] not in done))
+status = "✅" if answerer.answered == 1 and len(completed_ids(output_path)) == 21 else "❌"
+print(f"{status} Resume answered {answerer.answered} remaining item")
+
+print("\n" + "="*60)
+print("Batch answer test complete!")
+print("="*60)
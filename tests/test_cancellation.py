@@ -0,0 +1,57 @@
+"""Test the cancellation token used to skip answers"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+from threading import Thread
+
+from cancellation import CancellationToken, Cancelled
+
+print("="*60)
+print("TESTING CANCELLATION")
+print("="*60)
+
+token = CancellationToken()
+calls = []
+token.on_cancel(lambda: calls.append("http"))
+token.on_cancel(lambda: calls.append("speech"))
+status = "✅" if not token.cancelled and not calls else "❌"
+print(f"{status} Nothing runs before cancel")
+
+# Cancel from another thread (the skip button), twice
+for _ in range(2):
+    thread = Thread(target=token.cancel)
+    thread.start()
+    thread.join()
+status = "✅" if token.cancelled and calls == ["http", "speech"] else "❌"
+print(f"{status} Callbacks ran once: {calls}")
+
+# Registering after cancel runs right away
+token.on_cancel(lambda: calls.append("late"))
+status = "✅" if calls[-1] == "late" else "❌"
+print(f"{status} Late callback runs immediately")
+
+# A failing callback does not stop the others
+token = CancellationToken()
+token.on_cancel(lambda: 1 / 0)
+token.on_cancel(lambda: calls.append("after error"))
+token.cancel()
+status = "✅" if calls[-1] == "after error" else "❌"
+print(f"{status} Failing callback is reported, others still run")
+
+try:
+    token.raise_if_cancelled()
+    status = "❌"
+except Cancelled:
+    status = "✅"
+print(f"{status} raise_if_cancelled raises Cancelled")
+
+print("\n" + "="*60)
+print("Cancellation test complete!")
+print("="*60)
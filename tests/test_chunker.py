@@ -0,0 +1,64 @@
+"""Test the streaming text chunker"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import json
+
+from text_chunker import iter_chunks, iter_document_chunks, LANGCHAIN_SEPARATORS
+
+print("="*60)
+print("TESTING TEXT CHUNKER")
+print("="*60)
+
+with open(os.path.join(parent_dir, 'datasets', 'soccer_rules.json'), 'r', encoding='utf-8') as f:
+    rules = json.load(f)
+
+long_text = "\n\n".join(doc['content'] for doc in rules) * 3
+
+for name, separators in [("sentence", None), ("langchain", LANGCHAIN_SEPARATORS)]:
+    kwargs = {"separators": separators} if separators else {}
+    chunks = list(iter_chunks(long_text, chunk_size=500, chunk_overlap=50, **kwargs))
+    offsets_ok = all(long_text[c.start:c.end] == c.text for c in chunks)
+    sizes_ok = all(len(c.text) <= 500 for c in chunks)
+    in_order = all(a.start < b.start for a, b in zip(chunks, chunks[1:]))
+    status = "✅" if offsets_ok and sizes_ok and in_order else "❌"
+    print(f"{status} {name:9s}: {len(chunks)} chunks, offsets {'ok' if offsets_ok else 'WRONG'}, "
+          f"max {max(len(c.text) for c in chunks)} chars")
+
+# Sentence mode keeps sentences whole when they fit
+sentence_ends = {}
+for name, separators in [("sentence", None), ("langchain", LANGCHAIN_SEPARATORS)]:
+    kwargs = {"separators": separators} if separators else {}
+    chunks = list(iter_chunks(long_text, chunk_size=500, chunk_overlap=50, **kwargs))
+    sentence_ends[name] = sum(c.text.endswith(('.', '!', '?')) for c in chunks) / len(chunks)
+status = "✅" if sentence_ends["sentence"] > 0.9 and sentence_ends["sentence"] > sentence_ends["langchain"] else "❌"
+print(f"{status} Chunks ending on a sentence: {sentence_ends['sentence']:.0%} "
+      f"(langchain boundaries: {sentence_ends['langchain']:.0%})")
+
+# Small pieces are merged with overlap, tiny chunk sizes fall back to characters
+words = [c.text for c in iter_chunks("one two three four five six", chunk_size=10, chunk_overlap=4)]
+status = "✅" if words == ["one two", "two three", "four five", "six"] else "❌"
+print(f"{status} Word merge with overlap: {words}")
+
+status = "✅" if [c.text for c in iter_chunks("abcdef", chunk_size=4, chunk_overlap=0)] == ["abcd", "ef"] else "❌"
+print(f"{status} Character fallback")
+
+status = "✅" if list(iter_chunks("   \n\n  ")) == [] else "❌"
+print(f"{status} Whitespace-only text gives no chunks")
+
+# Documents stream lazily with their metadata
+stream = iter_document_chunks(rules, chunk_size=200, chunk_overlap=20)
+text, metadata = next(stream)
+status = "✅" if metadata["source"] == rules[0]["source"] and text in rules[0]["content"] else "❌"
+print(f"{status} First streamed chunk from '{metadata['source']}'")
+
+print("\n" + "="*60)
+print("Text chunker test complete!")
+print("="*60)
@@ -0,0 +1,39 @@
+"""Test token-budgeted context assembly"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import json
+
+from context_assembler import TokenCounter, ContextAssembler
+
+print("="*60)
+print("TESTING CONTEXT ASSEMBLER")
+print("="*60)
+
+with open(os.path.join(parent_dir, 'datasets', 'soccer_rules.json'), 'r', encoding='utf-8') as f:
+    rules = json.load(f)
+
+blocks = [f"[{doc['source']}]\n{doc['content']}" for doc in rules[:4]]
+counter = TokenCounter()
+assembler = ContextAssembler(counter, prompt_budget=1024)
+full = sum(counter.count(block) for block in blocks)
+
+for budget in [full + 50, 300, 120, 10]:
+    context = assembler.assemble(blocks, budget)
+    used = counter.count(context) if context else 0
+    complete_sentences = all(part.rstrip().endswith(('.', '!', '?')) for part in context.split("\n\n") if part)
+    status = "✅" if used <= budget and complete_sentences else "❌"
+    print(f"{status} Budget {budget:4d}: {used:4d} tokens, {len(context.split(chr(10) + chr(10))) if context else 0} blocks")
+
+print(f"\n📉 Total tokens saved: {assembler.tokens_saved}")
+
+print("\n" + "="*60)
+print("Context assembler test complete!")
+print("="*60)
@@ -0,0 +1,60 @@
+"""Test the persistent embedding cache"""
+import os
+import sys
+import tempfile
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+
+
+class CountingEmbeddings:
+    """Deterministic embedder that counts how many texts it embedded"""
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return [np.random.default_rng(len(t)).standard_normal(8).tolist() for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+print("="*60)
+print("TESTING EMBEDDING CACHE")
+print("="*60)
+
+cache_dir = tempfile.mkdtemp()
+texts = ["The ball is out of play", "A goal is scored", "Offside position"]
+
+model = CountingEmbeddings()
+embeddings = CachedEmbeddings(model, EmbeddingCache("test-model", directory=cache_dir))
+first = embeddings.embed_documents(texts)
+second = embeddings.embed_documents(texts)
+status = "✅" if model.calls == 3 and first == second else "❌"
+print(f"{status} Repeated texts served from cache ({model.calls} model calls)")
+
+# Reopen from disk
+model = CountingEmbeddings()
+embeddings = CachedEmbeddings(model, EmbeddingCache("test-model", directory=cache_dir))
+reloaded = embeddings.embed_documents(texts)
+status = "✅" if model.calls == 0 and reloaded == first else "❌"
+print(f"{status} Cache persisted across restarts ({model.calls} model calls)")
+
+# Size-based eviction: room for 64 vectors of 8 floats
+small = EmbeddingCache("small-model", directory=cache_dir, max_bytes=64 * 8 * 4)
+small.put_many([f"key{i}" for i in range(200)], np.ones((200, 8)))
+status = "✅" if len(small) <= 64 and small.rows == 64 else "❌"
+print(f"{status} Eviction keeps the cache bounded ({len(small)} entries, {small.rows} rows)")
+
+print("\n" + "="*60)
+print("Embedding cache test complete!")
+print("="*60)
@@ -0,0 +1,128 @@
+"""Test BM25 + vector hybrid retrieval"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import json
+import zlib
+import numpy as np
+
+from vector_retriever import Chunk, NumpyVectorStore
+from hybrid_retriever import HybridRetriever
+
+
+class HashingEmbeddings:
+    """Bag-of-words embedder, good enough to exercise the retriever"""
+    dim = 256
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.strip(".,?!").encode()) % self.dim] += 1.0
+        return vector.tolist()
+
+
+print("="*60)
+print("TESTING HYBRID RETRIEVAL")
+print("="*60)
+
+with open(os.path.join(parent_dir, 'datasets', 'soccer_rules.json'), 'r', encoding='utf-8') as f:
+    rules = json.load(f)
+
+chunks = [(doc['content'], {"source": doc['source'], "category": doc['category']}) for doc in rules]
+embeddings = HashingEmbeddings()
+store = NumpyVectorStore.from_texts(chunks, embeddings)
+chunk_objects = [Chunk(text, metadata) for text, metadata in chunks]
+
+test_cases = [
+    ("What is a throw-in?", "throw_in"),
+    ("What is offside?", "offside"),
+    ("When is a penalty kick given?", "penalty_kick"),
+    ("What does the VAR do?", "var"),
+]
+
+for mode in ["lexical", "hybrid"]:
+    retriever = HybridRetriever(store, chunk_objects, embeddings.embed_query,
+                                mode=mode, lexical_shortcut=0.8)
+    print(f"\n🔍 Mode: {mode}")
+    correct = 0
+    for query, category in test_cases:
+        docs = retriever.similarity_search(query, k=2)
+        got = docs[0].metadata['category'] if docs else None
+        status = "✅" if got == category else "❌"
+        correct += got == category
+        print(f"{status} '{query}' -> {got}")
+    print(f"   Accuracy: {correct}/{len(test_cases)}, "
+          f"embedding skipped {retriever.lexical_only} times, "
+          f"vector searches {retriever.vector_searches}")
+
+# Batched search must agree with one-by-one search in every mode
+queries = [query for query, _ in test_cases] + ["Who is the best striker?", "What is offside?"]
+for mode in ["vector", "lexical", "hybrid"]:
+    retriever = HybridRetriever(store, chunk_objects, embeddings.embed_query,
+                                mode=mode, lexical_shortcut=0.8)
+    single = [retriever.similarity_search(query, k=3) for query in queries]
+    batched = retriever.batch_search(queries, k=3)
+    status = "✅" if single == batched else "❌"
+    print(f"{status} Batched {mode} search matches single-query search")
+
+# A store scoring by distance (like Chroma) must rank the same as by similarity
+class DistanceStore:
+    """Returns 1 - cosine similarity, lower = closer"""
+    def __init__(self, store):
+        self.store = store
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k=4):
+        return [(doc, 1.0 - score) for doc, score in
+                self.store.similarity_search_by_vector_with_relevance_scores(embedding, k=k)]
+
+for mode in ["vector", "hybrid"]:
+    by_similarity = HybridRetriever(store, chunk_objects, embeddings.embed_query, mode=mode)
+    by_distance = HybridRetriever(DistanceStore(store), chunk_objects, embeddings.embed_query,
+                                  mode=mode, distances=True)
+    single = [by_distance.similarity_search(query, k=3) for query, _ in test_cases]
+    batched = by_distance.batch_search([query for query, _ in test_cases], k=3)
+    expected = [by_similarity.similarity_search(query, k=3) for query, _ in test_cases]
+    status = "✅" if single == expected and batched == expected else "❌"
+    print(f"{status} Distance-scored store ranks like the similarity store ({mode})")
+
+# Chroma-like store: batched search is one collection query
+class FakeCollection:
+    def __init__(self, store):
+        self.store = store
+        self.queries = 0
+
+    def query(self, query_embeddings, n_results, include):
+        self.queries += 1
+        hits = [DistanceStore(self.store).similarity_search_by_vector_with_relevance_scores(vector, k=n_results)
+                for vector in query_embeddings]
+        return {
+            "documents": [[doc.page_content for doc, _ in h] for h in hits],
+            "metadatas": [[doc.metadata for doc, _ in h] for h in hits],
+            "distances": [[score for _, score in h] for h in hits]
+        }
+
+class FakeChroma(DistanceStore):
+    def __init__(self, store):
+        super().__init__(store)
+        self._collection = FakeCollection(store)
+
+chroma = FakeChroma(store)
+retriever = HybridRetriever(chroma, chunk_objects, embeddings.embed_query, mode="hybrid", distances=True)
+single = [[doc.page_content for doc in retriever.similarity_search(query, k=3)] for query in queries]
+batched = [[doc.page_content for doc in docs] for docs in retriever.batch_search(queries, k=3)]
+status = "✅" if single == batched and chroma._collection.queries == 1 else "❌"
+print(f"{status} Chroma batch: {len(queries)} queries scored in {chroma._collection.queries} collection query")
+
+print("\n" + "="*60)
+print("Hybrid retrieval test complete!")
+print("="*60)
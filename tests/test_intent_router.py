@@ -0,0 +1,61 @@
+"""Test help / skip / exit command routing"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+from intent_router import IntentRouter, HELP, SKIP, EXIT
+
+print("="*60)
+print("TESTING INTENT ROUTER")
+print("="*60)
+
+router = IntentRouter()
+
+test_cases = [
+    ("help", HELP),
+    ("What can you do?", HELP),
+    ("Tell me about yourself, please", HELP),
+    ("What are your commands", HELP),
+    ("Show me your features", HELP),
+    ("Skip", SKIP),
+    ("skip please", SKIP),
+    ("Stop speaking!", SKIP),            # skip wins over exit ("stop")
+    ("Next", SKIP),
+    ("Bye.", EXIT),
+    ("Okay, goodbye Pixel Buddy", EXIT),
+    ("Stop", EXIT),
+    ("How long is stoppage time?", None),   # no "stop" inside words
+    ("What is the next World Cup?", None),  # commands only as the whole utterance
+    ("Can the referee stop the game?", None),
+    ("Who is the best goalkeeper?", None),
+    ("Can you help me understand the offside rule?", None),  # help words inside questions
+    ("What are the functions of a fourth official?", None),
+    ("What features make a good striker?", None),
+    ("close range shots?", None),           # short questions are not commands
+    ("Next World Cup?", None),
+    ("When's the next match?", None),
+    ("Whats next for Messi?", None),
+    ("Red card functions?", None),
+    ("Next?", None),                        # a command word asked as a question
+    ("", None),
+]
+
+for text, expected in test_cases:
+    intent = router.route(text)
+    status = "✅" if intent == expected else "❌"
+    print(f"{status} {str(intent):5s} <- {text!r}")
+
+# A phrase with a soccer term in it is never a command
+custom = IntentRouter([(EXIT, ['stop the match'], False)])
+status = "✅" if custom.route("Stop the match") is None else "❌"
+print(f"{status} Soccer term vetoes a command phrase")
+
+print("\n" + "="*60)
+print("Intent router test complete!")
+print("="*60)
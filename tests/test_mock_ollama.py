@@ -0,0 +1,114 @@
+"""Test the mock Ollama server (timing, streaming, error injection)"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_ollama import MockOllama
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode('utf-8'),
+                                     headers={"Content-Type": "application/json"})
+    return urllib.request.urlopen(request, timeout=10)
+
+
+def chat(mock, stream=True, num_predict=None):
+    """Streamed chat: (time to first token, total time, parts)"""
+    body = {"model": "llama2", "messages": [{"role": "user", "content": "How long is a match?"}],
+            "stream": stream}
+    if num_predict is not None:
+        body["options"] = {"num_predict": num_predict}
+    start = time.time()
+    first = None
+    parts = []
+    with post(mock.url + "/api/chat", body) as response:
+        for line in response:
+            if first is None:
+                first = time.time() - start
+            parts.append(json.loads(line))
+    return first, time.time() - start, parts
+
+
+print("="*60)
+print("TESTING MOCK OLLAMA")
+print("="*60)
+
+mock = MockOllama(ttft=0.2, tokens_per_second=50).start()
+print(f"🧪 Mock at {mock.url}")
+
+with urllib.request.urlopen(mock.url + "/api/tags", timeout=10) as response:
+    models = json.load(response)["models"]
+status = "✅" if models[0]["name"] == "llama2:latest" else "❌"
+print(f"{status} /api/tags lists {[m['name'] for m in models]}")
+
+# Streaming: first token after ttft, then tokens_per_second
+ttft, total, parts = chat(mock, num_predict=10)
+tokens = [p["message"]["content"] for p in parts if not p["done"]]
+expected = 0.2 + 9 / 50
+status = "✅" if 0.18 <= ttft <= 0.35 else "❌"
+print(f"{status} Time to first token {ttft:.3f}s (ttft 0.2s)")
+status = "✅" if expected - 0.02 <= total <= expected + 0.2 else "❌"
+print(f"{status} 10 tokens in {total:.3f}s (expected {expected:.2f}s)")
+status = "✅" if len(tokens) == 10 and parts[-1]["done"] and parts[-1]["eval_count"] == 10 else "❌"
+print(f"{status} Streamed NDJSON: {''.join(tokens)!r}")
+
+# Non-streaming reply is one JSON body with the whole answer
+_, _, parts = chat(mock, stream=False, num_predict=5)
+status = "✅" if len(parts) == 1 and parts[0]["done"] and len(parts[0]["message"]["content"].split()) == 5 else "❌"
+print(f"{status} stream=False: {parts[0]['message']['content']!r}")
+
+# /api/generate uses "response"; an empty prompt only loads the model
+with post(mock.url + "/api/generate", {"model": "llama2", "prompt": "", "stream": False}) as response:
+    loaded = json.load(response)
+with post(mock.url + "/api/generate", {"model": "llama2", "prompt": "Hi", "options": {"num_predict": 3}}) as response:
+    parts = [json.loads(line) for line in response]
+status = "✅" if loaded["done"] and len([p for p in parts if p.get("response")]) == 3 else "❌"
+print(f"{status} /api/generate load + 3 tokens")
+
+# Concurrent requests overlap instead of queueing
+start = time.time()
+with ThreadPoolExecutor(8) as pool:
+    list(pool.map(lambda _: chat(mock, num_predict=5), range(8)))
+elapsed = time.time() - start
+status = "✅" if elapsed < 2 * (0.2 + 4 / 50) and mock.stats()["peak_active"] == 8 else "❌"
+print(f"{status} 8 concurrent chats in {elapsed:.2f}s (peak {mock.stats()['peak_active']})")
+mock.stop()
+
+# Error injection is repeatable for a given seed
+def failures(seed):
+    mock = MockOllama(ttft=0, tokens_per_second=1000, error_rate=0.3, seed=seed).start()
+    failed = []
+    for i in range(20):
+        try:
+            chat(mock, num_predict=2)
+        except urllib.error.HTTPError as e:
+            if e.code == 500 and "error" in json.load(e):
+                failed.append(i)
+    mock.stop()
+    return failed
+
+first, second = failures(7), failures(7)
+status = "✅" if first == second and 0 < len(first) < 20 else "❌"
+print(f"{status} error_rate 0.3: requests {first} fail, same again with the same seed")
+
+mock = MockOllama(ttft=0, tokens_per_second=1000, stream_error_rate=1.0).start()
+_, _, parts = chat(mock, num_predict=10)
+status = "✅" if "error" in parts[-1] and len(parts) == 6 else "❌"
+print(f"{status} stream_error_rate: error line after {len(parts) - 1} tokens")
+mock.stop()
+
+print("\n" + "="*60)
+print("Mock Ollama test complete!")
+print("="*60)
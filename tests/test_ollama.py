@@ -1,4 +1,18 @@
 """Test Ollama local LLM"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+# python tests/test_ollama.py --mock runs against mock_ollama.py instead
+if "--mock" in sys.argv:
+    from mock_ollama import use_mock_ollama
+    use_mock_ollama(ttft=0.05, tokens_per_second=200)
 
 try:
     import ollama
@@ -30,6 +44,55 @@ try:
     
     print(f"✅ Response: {response['message']['content']}")
     
+    # Test streaming (what NLPProcessor.process_stream uses)
+    print("\n3. Testing streaming chat...")
+    import time
+    start = time.time()
+    first_token = None
+    pieces = []
+    for part in ollama.chat(
+        model='llama2',
+        messages=[{
+            'role': 'user',
+            'content': 'Say hello in one sentence.'
+        }],
+        stream=True
+    ):
+        if first_token is None:
+            first_token = time.time() - start
+        pieces.append(part['message']['content'])
+    
+    print(f"✅ Streamed {len(pieces)} pieces, first after {first_token:.2f}s, all after {time.time() - start:.2f}s")
+    
+    # Test concurrent async requests (what NLPProcessor.aprocess uses)
+    print("\n4. Testing concurrent NLPProcessor.aprocess...")
+    import asyncio
+    from nlp_processor import NLPProcessor
+    nlp = NLPProcessor(mode="local", use_rag=False)
+    nlp.response_cache = None  # measure real generations
+    
+    async def ask_all():
+        questions = [f"In one sentence, what is rule {i} of soccer?" for i in range(1, 7)]
+        return await asyncio.gather(*[nlp.aprocess(q) for q in questions])
+    
+    start = time.time()
+    answers = asyncio.run(ask_all())
+    ok = sum(1 for a in answers if not a.startswith("Sorry"))
+    status = "✅" if ok == len(answers) else "❌"
+    print(f"{status} {ok}/{len(answers)} answers in {time.time() - start:.2f}s (max_concurrency={nlp.max_concurrency})")
+    
+    # Identical questions in flight share one generation
+    async def ask_same():
+        return await asyncio.gather(*[nlp.aprocess("What is a throw-in in soccer?") for _ in range(4)])
+    
+    answers = asyncio.run(ask_same())
+    status = "✅" if len(set(answers)) == 1 and nlp.coalesced == 3 else "❌"
+    print(f"{status} 4 identical requests, {nlp.coalesced} coalesced")
+    
+    answer = asyncio.run(nlp.aprocess("Explain the whole history of soccer in detail.", timeout=0.01))
+    status = "✅" if "too long" in answer else "❌"
+    print(f"{status} Timeout: {answer}")
+    
     print("\n" + "="*60)
     print("Ollama test complete!")
     print("="*60)
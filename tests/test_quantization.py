@@ -0,0 +1,39 @@
+"""Test reduced-precision embedding storage against float32"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import numpy as np
+
+from vector_retriever import Chunk, NumpyVectorStore, measure_recall
+
+print("="*60)
+print("TESTING REDUCED-PRECISION VECTOR INDEX")
+print("="*60)
+
+rng = np.random.default_rng(42)
+vectors = rng.standard_normal((5000, 384)).astype(np.float32)
+queries = vectors[:200] + 0.3 * rng.standard_normal((200, 384)).astype(np.float32)
+docs = [Chunk(f"chunk {i}", {"source": "synthetic"}) for i in range(len(vectors))]
+
+reference = NumpyVectorStore(embedding=None, precision="float32")
+reference.add_vectors(vectors, docs)
+
+for precision in ["float16", "int8"]:
+    store = NumpyVectorStore(embedding=None, precision=precision)
+    store.add_vectors(vectors, docs)
+
+    recall = measure_recall(reference, store, queries, k=5)
+    ratio = store.nbytes / reference.nbytes
+    status = "✅" if recall >= 0.95 else "❌"
+    print(f"{status} {precision}: recall@5 = {recall:.3f}, memory = {ratio:.0%} of float32")
+
+print("\n" + "="*60)
+print("Quantization test complete!")
+print("="*60)
@@ -18,6 +18,11 @@ sys.path.append(parent_dir)
 import sys
 sys.path.append('..')
 
+# python tests/test_rag.py --mock runs against mock_ollama.py instead
+if "--mock" in sys.argv:
+    from mock_ollama import use_mock_ollama
+    use_mock_ollama(ttft=0.05, tokens_per_second=200)
+
 from nlp_processor import NLPProcessor
 
 print("="*60)
@@ -26,6 +31,7 @@ print("="*60)
 
 print("\nInitializing NLP Processor with RAG...")
 nlp = NLPProcessor(mode="local", use_rag=True)
+nlp.wait_for_rag()
 
 test_queries = [
     "What is offside in soccer?",          # From rules
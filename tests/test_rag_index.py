@@ -0,0 +1,132 @@
+"""Test incremental sync and compaction of the RAG index"""
+import os
+import sys
+import tempfile
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+from rag_index import RAGIndex, chunk_hash
+
+
+class FakeCollection:
+    def __init__(self, store):
+        self.store = store
+
+    def count(self):
+        return len(self.store.entries)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        for entry_id, embedding, text, metadata in zip(ids, embeddings, documents, metadatas):
+            self.store.entries[entry_id] = (text, metadata, embedding)
+
+
+class FakeStore:
+    """Stands in for Chroma: keeps entries in a dict and records add/delete calls"""
+    def __init__(self):
+        self.entries = {}
+        self.added = []
+        self.deleted = []
+        self._collection = FakeCollection(self)
+
+    def add_texts(self, texts, metadatas, ids):
+        self.added.append(list(ids))
+        for text, metadata, entry_id in zip(texts, metadatas, ids):
+            self.entries[entry_id] = (text, metadata, [float(len(text))])
+
+    def delete(self, ids):
+        self.deleted.append(list(ids))
+        for entry_id in ids:
+            self.entries.pop(entry_id, None)
+
+    def delete_collection(self):
+        self.entries.clear()
+
+    def get(self, include):
+        ids = list(self.entries)
+        return {
+            "ids": ids,
+            "documents": [self.entries[i][0] for i in ids],
+            "metadatas": [self.entries[i][1] for i in ids],
+            "embeddings": [self.entries[i][2] for i in ids]
+        }
+
+
+class FakeIndex(RAGIndex):
+    """RAGIndex over one FakeStore that survives reopening"""
+    def __init__(self, persist_directory, embedding_model, store):
+        super().__init__(persist_directory, embedding_model)
+        self.store = store
+
+    def open_store(self, embeddings=None):
+        self.store.added, self.store.deleted = [], []
+        return self.store
+
+
+print("="*60)
+print("TESTING RAG INDEX")
+print("="*60)
+
+index_dir = tempfile.mkdtemp()
+store = FakeStore()
+chunks = [
+    ("A match lasts 90 minutes.", {"source": "rules", "category": "duration"}),
+    ("Offside is judged when the ball is played.", {"source": "rules", "category": "offside"}),
+    ("A match lasts 90 minutes.", {"source": "rules", "category": "duration"}),  # duplicate
+]
+
+# Cold start: every unique chunk is embedded once
+FakeIndex(index_dir, "model-a", store).sync(chunks, embeddings=None)
+status = "✅" if [len(ids) for ids in store.added] == [2] and not store.deleted else "❌"
+print(f"{status} Cold start added {sum(len(ids) for ids in store.added)} chunks (duplicate skipped)")
+
+# Unchanged restart: nothing is embedded or deleted
+FakeIndex(index_dir, "model-a", store).sync(chunks, embeddings=None)
+status = "✅" if not store.added and not store.deleted and len(store.entries) == 2 else "❌"
+print(f"{status} Restart reused all {len(store.entries)} chunks")
+
+# One chunk changed: one added, one removed
+changed = [chunks[0], ("Offside is judged when a teammate plays the ball.", {"source": "rules"})]
+FakeIndex(index_dir, "model-a", store).sync(changed, embeddings=None)
+status = "✅" if ([len(ids) for ids in store.added] == [1]
+                  and store.deleted == [[chunk_hash(*chunks[1])]]) else "❌"
+print(f"{status} Changed chunk: 1 added, 1 removed")
+
+# Different embedding model: everything is embedded again
+FakeIndex(index_dir, "model-b", store).sync(changed, embeddings=None)
+status = "✅" if [len(ids) for ids in store.added] == [2] and len(store.entries) == 2 else "❌"
+print(f"{status} Model switch re-embedded {sum(len(ids) for ids in store.added)} chunks")
+
+# A stream is read once, in batches (never as a whole list)
+read = []
+def stream():
+    for chunk in changed + [("Corner kicks restart play.", {"source": "rules"})]:
+        read.append(chunk)
+        yield chunk
+
+FakeIndex(index_dir, "model-b", store).sync(stream(), embeddings=None, batch_size=1)
+status = "✅" if len(read) == 3 and [len(ids) for ids in store.added] == [1] and len(store.entries) == 3 else "❌"
+print(f"{status} Streamed sync read {len(read)} chunks once, embedded only the new one")
+FakeIndex(index_dir, "model-b", store).sync(changed, embeddings=None)  # back to two chunks
+
+# Compaction keeps one copy per hash under its content id
+text, metadata = changed[0]
+store.entries["legacy-1"] = (text, metadata, [1.0])
+store.entries["legacy-2"] = (text, metadata, [1.0])
+store.entries["legacy-3"] = ("Only in an old index.", {"source": "old"}, [2.0])
+removed = FakeIndex(index_dir, "model-b", store).compact()
+expected = {chunk_hash(*changed[0]), chunk_hash(*changed[1]), chunk_hash("Only in an old index.", {"source": "old"})}
+status = "✅" if removed == 2 and set(store.entries) == expected else "❌"
+print(f"{status} Compaction removed {removed} duplicates, kept {len(store.entries)} unique chunks")
+
+manifest = RAGIndex(index_dir, "model-b").load_manifest()
+status = "✅" if set(manifest["chunks"]) == expected and manifest["embedding_model"] == "model-b" else "❌"
+print(f"{status} Manifest lists the {len(manifest['chunks'])} kept chunks")
+
+print("\n" + "="*60)
+print("RAG index test complete!")
+print("="*60)
@@ -0,0 +1,115 @@
+"""Test the exact / normalized / semantic response cache"""
+import os
+import sys
+import tempfile
+import json
+import time
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import zlib
+import numpy as np
+
+from response_cache import ResponseCache
+
+SYNONYMS = {"football": "soccer", "game": "match", "minutes": "long"}
+
+
+def embed(text):
+    """Bag-of-words embedder with a few synonyms, so paraphrases land close"""
+    vector = np.zeros(256, dtype=np.float32)
+    for word in text.lower().split():
+        word = word.strip(".,?!'")
+        word = SYNONYMS.get(word, word)
+        vector[zlib.crc32(word.encode()) % 256] += 1.0
+    return vector.tolist()
+
+
+print("="*60)
+print("TESTING RESPONSE CACHE")
+print("="*60)
+
+path = os.path.join(tempfile.mkdtemp(), "responses.json")
+cache = ResponseCache(path=path, maxsize=3, ttl=60, similarity=0.75)
+answer = "A soccer match lasts 90 minutes."
+cache.put("llama2", "v1", "How long is a soccer match?", answer, vector=embed("How long is a soccer match?"))
+
+# Three lookup levels
+test_cases = [
+    ("How long is a soccer match?", answer, "exact"),
+    ("  how LONG is a soccer match ", answer, "normalized"),
+    ("How many minutes is a football game?", answer, "semantic"),
+    ("Who won the 2014 World Cup?", None, "miss"),
+]
+for question, expected, level in test_cases:
+    result = cache.get("llama2", "v1", question, embed=embed)
+    status = "✅" if result == expected else "❌"
+    print(f"{status} {level:10s} <- {question!r}")
+
+# Scoped by model and index version
+status = "✅" if cache.get("llama3", "v1", "How long is a soccer match?") is None else "❌"
+print(f"{status} Other model misses")
+status = "✅" if cache.get("llama2", "v2", "How long is a soccer match?") is None else "❌"
+print(f"{status} Other index version misses")
+
+# Different numbers are never paraphrases
+cache.put("llama2", "v1", "Who won the 2014 World Cup?", "Germany.", vector=embed("Who won the 2014 World Cup?"))
+status = "✅" if cache.get("llama2", "v1", "Who won the 2018 World Cup?", embed=embed) is None else "❌"
+print(f"{status} 2014 answer not reused for 2018")
+
+# LRU: the least recently used answer goes first
+cache.get("llama2", "v1", "How long is a soccer match?")
+cache.put("llama2", "v1", "What is offside?", "Offside is ...")
+cache.put("llama2", "v1", "What is a corner kick?", "A corner kick is ...")
+status = "✅" if cache.get("llama2", "v1", "Who won the 2014 World Cup?") is None and \
+    cache.get("llama2", "v1", "How long is a soccer match?") == answer else "❌"
+print(f"{status} LRU eviction keeps recently used answers ({len(cache.entries)} entries)")
+
+# TTL
+cache.entries[next(reversed(cache.entries))]["created"] -= 120
+status = "✅" if cache.get("llama2", "v1", "How long is a soccer match?") is None else "❌"
+print(f"{status} Expired answer is not served")
+
+# Persistence across restarts
+cache.save()
+reloaded = ResponseCache(path=path, maxsize=3, ttl=60, similarity=0.75)
+status = "✅" if reloaded.get("llama2", "v1", "What is offside?") == "Offside is ..." else "❌"
+print(f"{status} Answers survive a restart ({len(reloaded.entries)} loaded)")
+
+# A burst of answers is written once, after save_delay
+burst_path = os.path.join(tempfile.mkdtemp(), "burst.json")
+burst = ResponseCache(path=burst_path, maxsize=100, save_delay=0.2)
+saves = []
+original_save = burst.save
+burst.save = lambda: (saves.append(1), original_save())
+for i in range(50):
+    burst.put("llama2", "v1", f"Question {i}?", f"Answer {i}.", vector=embed(f"Question {i}?"))
+written_early = os.path.exists(burst_path)
+time.sleep(0.5)
+with open(burst_path, 'r', encoding='utf-8') as f:
+    saved = len(json.load(f)["entries"])
+status = "✅" if not written_early and len(saves) == 1 and saved == 50 else "❌"
+print(f"{status} 50 puts -> {len(saves)} background write of {saved} answers")
+
+# Lookup speed
+lookups = 1000
+start = time.time()
+for _ in range(lookups):
+    reloaded.get("llama2", "v1", "What is offside?")
+elapsed_ms = (time.time() - start) * 1000 / lookups
+status = "✅" if elapsed_ms < 1 else "❌"
+print(f"{status} Cache hit: {elapsed_ms:.3f} ms")
+
+stats = cache.stats()
+print(f"📊 Stats: {stats}")
+status = "✅" if stats["exact_hits"] and stats["normalized_hits"] and stats["semantic_hits"] else "❌"
+print(f"{status} Hit rate {stats['hit_rate']:.0%} across all levels")
+
+print("\n" + "="*60)
+print("Response cache test complete!")
+print("="*60)
@@ -0,0 +1,52 @@
+"""Test splitting a token stream into sentences"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import random
+
+from sentence_stream import SentenceSplitter, iter_sentences
+
+print("="*60)
+print("TESTING SENTENCE STREAM")
+print("="*60)
+
+answer = ("A match lasts 90 minutes. It is played in two halves of 45 minutes, "
+          "e.g. the first and the second half. Mr. Collina refereed the 2002 final! "
+          "Is 2.5 goals a lot? Yes.\nExtra time adds two periods of 15 minutes")
+expected = [
+    "A match lasts 90 minutes.",
+    "It is played in two halves of 45 minutes, e.g. the first and the second half.",
+    "Mr. Collina refereed the 2002 final!",
+    "Is 2.5 goals a lot? Yes.",
+    "Extra time adds two periods of 15 minutes",
+]
+
+# Same sentences no matter how the stream is cut into tokens
+rng = random.Random(0)
+for trial in range(3):
+    pieces, i = [], 0
+    while i < len(answer):
+        size = rng.randint(1, 8)
+        pieces.append(answer[i:i + size])
+        i += size
+    sentences = list(iter_sentences(pieces))
+    status = "✅" if sentences == expected else "❌"
+    print(f"{status} {len(pieces)} tokens -> {len(sentences)} sentences")
+
+# A sentence is released as soon as the next token shows it ended
+splitter = SentenceSplitter()
+released = splitter.feed("A match lasts 90 minutes.")
+released += splitter.feed(" It is")
+status = "✅" if released == ["A match lasts 90 minutes."] and splitter.flush() == ["It is"] else "❌"
+print(f"{status} First sentence released before the answer is complete")
+
+print("\n" + "="*60)
+print("Sentence stream test complete!")
+print("="*60)
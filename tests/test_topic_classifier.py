@@ -0,0 +1,95 @@
+"""Test the embedding-centroid topic classifier"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from topic_filter import CentroidClassifier
+from query_cache import QueryCache, extends_query, normalize_query
+
+
+class HashingEmbeddings:
+    """Bag-of-words embedder, good enough to exercise the classifier"""
+    dim = 256
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.strip(".,?!'").encode()) % self.dim] += 1.0
+        return vector.tolist()
+
+
+print("="*60)
+print("TESTING TOPIC CLASSIFIER")
+print("="*60)
+
+embeddings = HashingEmbeddings()
+classifier = CentroidClassifier(embeddings.embed_documents)
+
+test_cases = [
+    ("What is a penalty kick in soccer?", True),
+    ("How many players does a football team have?", True),
+    ("Who won the World Cup final?", True),
+    ("How do I cook rice?", False),
+    ("What is the capital of Spain?", False),
+    ("How does the stock market crash?", False),
+]
+
+for query, expected in test_cases:
+    score = classifier.score(embeddings.embed_query(query))
+    status = "✅" if (score > 0) == expected else "❌"
+    print(f"{status} {score:+.3f} {'Soccer' if score > 0 else 'Not soccer':10s} <- {query}")
+
+# The filter and retrieval share one query vector through the cache
+cache = QueryCache()
+embeddings.calls = 0
+vector = cache.vector("v1", "Who is the best goalkeeper?", embeddings.embed_query)
+classifier.is_soccer_related(vector)
+cache.vector("v1", "who is the best goalkeeper", embeddings.embed_query)
+status = "✅" if embeddings.calls == 1 else "❌"
+print(f"{status} Query embedded {embeddings.calls} time(s) for filter + retrieval")
+
+# Filter and speculative retrieval miss at the same time: still one embedding
+def slow_embed(text):
+    time.sleep(0.1)
+    return embeddings.embed_query(text)
+
+embeddings.calls = 0
+with ThreadPoolExecutor(2) as pool:
+    vectors = list(pool.map(lambda _: cache.vector("v1", "What is a corner kick?", slow_embed), range(2)))
+status = "✅" if embeddings.calls == 1 and vectors[0] is vectors[1] else "❌"
+print(f"{status} Concurrent misses embedded {embeddings.calls} time(s)")
+
+# A final transcript reuses the retrieval of a partial one it extends
+cases = [
+    ("How long does a", "How long does a match last?", True),
+    ("How long does a mat", "How long does a match last?", True),  # word cut off
+    ("How long", "How long does a match last?", False),  # covers too little
+    ("How long does a", "How long do a match last?", False),  # transcript changed
+    ("How long does a match last and", "How long does a match last?", False),
+]
+for partial, final, expected in cases:
+    result = extends_query(normalize_query(partial), normalize_query(final))
+    status = "✅" if result == expected else "❌"
+    print(f"{status} {partial!r} -> {final!r}: {'reused' if result else 'new retrieval'}")
+
+print("\n" + "="*60)
+print("Topic classifier test complete!")
+print("="*60)
@@ -0,0 +1,94 @@
+"""Test the compiled topic matcher"""
+import os
+import sys
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import json
+import shutil
+import tempfile
+import time
+
+from topic_filter import TopicFilter, LexiconWatcher, load_lexicon, benchmark_corpus, DEFAULT_LEXICON_PATH
+
+print("="*60)
+print("TESTING TOPIC MATCHER")
+print("="*60)
+
+topic_filter = TopicFilter()
+
+test_cases = [
+    ("Who scored the most goals?", True),            # inflections
+    ("How many players are on a team?", True),
+    ("Explain the throw-in rule", True),              # hyphenated keyword
+    ("Explain the throw in rule", True),              # same phrase without the hyphen
+    ("When is a red-card shown?", True),              # parts of hyphenated words
+    ("What is a free-kick?", True),
+    ("What's the offside-rule?", True),
+    ("What is a goalkick?", True),                    # compounds in the lexicon
+    ("Who is the goalscorer record holder?", True),
+    ("What counts as a handball?", True),
+    ("What is a well-known recipe?", False),
+    ("When was the first World Cup?", True),          # phrase
+    ("Is Messi's left foot better?", True),           # possessive
+    ("Tell me about basketball", False),              # no "ball" inside words
+    ("What are the various options?", False),         # no "var" inside words
+    ("Who will win the tennis final?", False),        # context word + other sport
+    ("Who will win on Sunday?", True),                # context word alone
+]
+
+for query, expected in test_cases:
+    result = topic_filter.is_soccer_related(query)
+    status = "✅" if result == expected else "❌"
+    print(f"{status} {'Soccer' if result else 'Not soccer':10s} <- {query}")
+
+hits = topic_filter.matcher.hits("Did the striker win the world cup with his club?")
+status = "✅" if "world cup" in hits.get("soccer", []) and "win" in hits.get("context", []) else "❌"
+print(f"{status} Hits: {hits}")
+
+queries = benchmark_corpus(20000)
+start = time.perf_counter()
+for query in queries:
+    topic_filter.is_soccer_related(query)
+elapsed = (time.perf_counter() - start) / len(queries)
+print(f"\n⏱️  {elapsed * 1e6:.1f} µs per query")
+
+# Hot reload: edit a copy of the lexicon while a watcher polls it
+tmp_dir = tempfile.mkdtemp()
+lexicon_path = os.path.join(tmp_dir, "topic_lexicon.json")
+shutil.copy(DEFAULT_LEXICON_PATH, lexicon_path)
+
+watched = TopicFilter(load_lexicon(lexicon_path))
+watcher = LexiconWatcher(lexicon_path, watched.set_lexicon, interval=0.05).start()
+before = watched.is_soccer_related("Who invented futsal?")
+
+lexicon = load_lexicon(lexicon_path)
+lexicon["soccer"].append("futsal")
+with open(lexicon_path, 'w', encoding='utf-8') as f:
+    json.dump(lexicon, f)
+os.utime(lexicon_path, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+deadline = time.time() + 2
+while watcher.reloads == 0 and time.time() < deadline:
+    time.sleep(0.02)
+after = watched.is_soccer_related("Who invented futsal?")
+status = "✅" if not before and after else "❌"
+print(f"{status} Lexicon reloaded while running: 'futsal' {before} -> {after}")
+
+# A broken edit keeps the current lexicon
+with open(lexicon_path, 'w', encoding='utf-8') as f:
+    f.write("{ not json")
+os.utime(lexicon_path, ns=(time.time_ns(), time.time_ns() + 2 * 10**9))
+status = "✅" if not watcher.check() and watched.is_soccer_related("Who invented futsal?") else "❌"
+print(f"{status} Broken lexicon file ignored")
+watcher.stop()
+shutil.rmtree(tmp_dir)
+
+print("\n" + "="*60)
+print("Topic matcher test complete!")
+print("="*60)
@@ -0,0 +1,75 @@
+"""Test the in-memory NumPy vector retriever"""
+import os
+import sys
+import time
+# ------------------------------------------------------------------
+# PATH FIX: Allow importing from the main folder
+# ------------------------------------------------------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+# ------------------------------------------------------------------
+
+import json
+import zlib
+import numpy as np
+
+from vector_retriever import NumpyVectorStore
+
+
+class HashingEmbeddings:
+    """Bag-of-words embedder, good enough to exercise the retriever"""
+    dim = 256
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.strip(".,?!").encode()) % self.dim] += 1.0
+        return vector.tolist()
+
+
+print("="*60)
+print("TESTING NUMPY VECTOR RETRIEVER")
+print("="*60)
+
+with open(os.path.join(parent_dir, 'datasets', 'soccer_rules.json'), 'r', encoding='utf-8') as f:
+    rules = json.load(f)
+
+chunks = [(doc['content'], {"source": doc['source'], "category": doc['category']}) for doc in rules]
+store = NumpyVectorStore.from_texts(chunks, HashingEmbeddings())
+print(f"\n📚 Indexed {len(store)} chunks, matrix {store.matrix.shape} {store.matrix.dtype}")
+
+queries = [
+    "What is offside position?",
+    "How long does a match last?",
+    "When is a penalty kick awarded?",
+]
+
+# Top-k must agree with a full sort
+for query in queries:
+    query_vector = store.embedding.embed_query(query)
+    expected = list(np.argsort(-store.score(query_vector), kind="stable")[:3])
+    got = [store.docs.index(doc) for doc in store.similarity_search(query, k=3)]
+    status = "✅" if got == expected else "❌"
+    print(f"{status} '{query}' -> {store.docs[got[0]].metadata['source']}")
+
+# Batched queries must match single queries
+single = [[doc for doc, _ in store.similarity_search_with_relevance_scores(q, k=3)] for q in queries]
+batched = [[doc for doc, _ in hits] for hits in store.batch_search(queries, k=3)]
+status = "✅" if single == batched else "❌"
+print(f"{status} Batched search matches single-query search")
+
+# Latency
+query_vector = store.embedding.embed_query(queries[0])
+start = time.perf_counter()
+for _ in range(1000):
+    store.similarity_search_by_vector(query_vector, k=3)
+elapsed = (time.perf_counter() - start) / 1000
+print(f"\n⏱️  Search latency: {elapsed * 1e6:.1f} µs per query")
+
+print("\n" + "="*60)
+print("Vector retriever test complete!")
+print("="*60)
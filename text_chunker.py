@@ -0,0 +1,217 @@
+"""
+Text Chunker for PIXEL BUDDY
+Dependency-free, streaming replacement for langchain's
+RecursiveCharacterTextSplitter
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+# Same boundaries as RecursiveCharacterTextSplitter's defaults
+LANGCHAIN_SEPARATORS = ("\n\n", "\n", " ", "")
+
+# Paragraph, line, then sentence boundaries before falling back to words
+SENTENCE_SEPARATORS = ("\n\n", "\n", ". ", "? ", "! ", " ", "")
+
+# Sentence separators stay with the sentence they end
+END_ATTACHED = frozenset([". ", "? ", "! "])
+
+
+class TextChunk(NamedTuple):
+    text: str
+    start: int
+    end: int
+
+
+_PATTERNS = {}
+
+
+def _boundaries(text: str, start: int, end: int, separator: str) -> List[int]:
+    """
+    Split text[start:end] on separator
+
+    Returns the piece boundaries [start, ..., end]; piece i is
+    text[bounds[i]:bounds[i + 1]] and no piece is empty.
+    """
+    if separator == "":
+        return list(range(start, end + 1))
+
+    pattern = _PATTERNS.get(separator)
+    if pattern is None:
+        pattern = _PATTERNS[separator] = re.compile(re.escape(separator))
+
+    offset = len(separator) if separator in END_ATTACHED else 0
+    bounds = [start]
+    bounds.extend([match.start() + offset for match in pattern.finditer(text, start, end)])
+    bounds.append(end)
+
+    # Only the first (separator at the start) or last (sentence end at the end) piece can be empty
+    if len(bounds) > 1 and bounds[1] == bounds[0]:
+        del bounds[0]
+    if len(bounds) > 1 and bounds[-1] == bounds[-2]:
+        bounds.pop()
+    return bounds
+
+
+def _strip(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Shrink a span to exclude surrounding whitespace"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _merge(bounds: List[int], first: int, last: int, chunk_size: int, chunk_overlap: int) -> Iterator[Tuple[int, int]]:
+    """
+    Greedily merge pieces first..last-1 into chunks with overlap
+
+    Pieces are contiguous, so a run of pieces is one span and its
+    length is a difference of two boundaries.
+    """
+    i = first
+    for j in range(first, last):
+        if bounds[j + 1] - bounds[i] > chunk_size and j > i:
+            yield bounds[i], bounds[j]
+            while i < j and (bounds[j] - bounds[i] > chunk_overlap or bounds[j + 1] - bounds[i] > chunk_size):
+                i += 1
+    yield bounds[i], bounds[last]
+
+
+def _split(text: str, start: int, end: int, separators: Tuple[str, ...],
+           chunk_size: int, chunk_overlap: int) -> Iterator[Tuple[int, int]]:
+    """Recursively split text[start:end] into chunk spans"""
+    separator = separators[-1]
+    remaining = ()
+    for i, candidate in enumerate(separators):
+        if candidate == "":
+            separator = candidate
+            break
+        if text.find(candidate, start, end) != -1:
+            separator = candidate
+            remaining = separators[i + 1:]
+            break
+
+    bounds = _boundaries(text, start, end, separator)
+    run = None  # first piece of the current run of small pieces
+    for j in range(len(bounds) - 1):
+        if bounds[j + 1] - bounds[j] < chunk_size:
+            if run is None:
+                run = j
+            continue
+        if run is not None:
+            yield from _merge(bounds, run, j, chunk_size, chunk_overlap)
+            run = None
+        if not remaining:
+            yield bounds[j], bounds[j + 1]
+        else:
+            yield from _split(text, bounds[j], bounds[j + 1], remaining, chunk_size, chunk_overlap)
+    if run is not None:
+        yield from _merge(bounds, run, len(bounds) - 1, chunk_size, chunk_overlap)
+
+
+def iter_chunks(text: str, chunk_size=500, chunk_overlap=50,
+                separators=SENTENCE_SEPARATORS) -> Iterator[TextChunk]:
+    """
+    Lazily split text into chunks with character offsets
+
+    Tries paragraph, line and sentence boundaries before words. With
+    separators=LANGCHAIN_SEPARATORS the chunks are identical to
+    RecursiveCharacterTextSplitter(chunk_size, chunk_overlap).
+
+    Args:
+        text: Text to split
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Characters carried over between chunks
+        separators: Boundaries to try, coarsest first
+
+    Yields:
+        TextChunk(text, start, end) with text == original[start:end]
+    """
+    if chunk_overlap > chunk_size:
+        raise ValueError(f"chunk_overlap ({chunk_overlap}) larger than chunk_size ({chunk_size})")
+
+    for start, end in _split(text, 0, len(text), tuple(separators), chunk_size, chunk_overlap):
+        start, end = _strip(text, start, end)
+        if end > start:
+            yield TextChunk(text[start:end], start, end)
+
+
+def iter_document_chunks(documents: Iterable[Dict], **kwargs) -> Iterator[Tuple[str, Dict]]:
+    """
+    Stream (chunk text, metadata) pairs for knowledge base documents
+
+    Args:
+        documents: Dicts with 'content', 'source' and 'category'
+        **kwargs: Passed to iter_chunks
+    """
+    for doc in documents:
+        metadata = {
+            "source": doc.get('source', 'Unknown'),
+            "category": doc.get('category', 'general')
+        }
+        for chunk in iter_chunks(doc['content'], **kwargs):
+            yield chunk.text, metadata
+
+
+def _import_time(module: str) -> str:
+    """Time a fresh interpreter needs to import a module"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    return f"{float(result.stdout):.3f}s" if result.returncode == 0 else "n/a"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the chunker with langchain's splitter")
+    parser.add_argument("--dataset", default="datasets/soccer_rules.json")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(args.dataset, 'r', encoding='utf-8') as f:
+        texts = [doc['content'] for doc in json.load(f)]
+    # One long multi-paragraph document as well
+    texts.append("\n\n".join(texts) * 5)
+    characters = sum(len(text) for text in texts)
+
+    print(f"📊 Benchmark: {len(texts)} texts, {characters} characters, {args.repeat} runs\n")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        ours = [[c.text for c in iter_chunks(t, separators=LANGCHAIN_SEPARATORS)] for t in texts]
+    ours_time = (time.perf_counter() - start) / args.repeat
+    print(f"   text_chunker (langchain boundaries): {ours_time * 1e3:.2f} ms")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        sentences = [[c.text for c in iter_chunks(t)] for t in texts]
+    print(f"   text_chunker (sentence boundaries):  {(time.perf_counter() - start) / args.repeat * 1e3:.2f} ms")
+
+    sentence_ends = sum(c.endswith(('.', '!', '?')) for chunks in sentences for c in chunks)
+    total_sentence_chunks = sum(len(chunks) for chunks in sentences)
+    print(f"   Sentence mode: {sentence_ends}/{total_sentence_chunks} chunks end on a sentence")
+
+    print(f"\n⏱️  Import time: text_chunker {_import_time('text_chunker')}, "
+          f"langchain.text_splitter {_import_time('langchain.text_splitter')}")
+
+    try:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+    except ImportError:
+        print("\n⚠️  langchain not installed, skipping boundary comparison")
+        sys.exit(0)
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        theirs = [splitter.split_text(t) for t in texts]
+    theirs_time = (time.perf_counter() - start) / args.repeat
+    print(f"\n   langchain splitter:                  {theirs_time * 1e3:.2f} ms "
+          f"({theirs_time / ours_time:.1f}x)")
+
+    same = sum(a == b for a, b in zip(ours, theirs))
+    status = "✅" if same == len(texts) else "❌"
+    print(f"\n{status} Identical chunks for {same}/{len(texts)} texts")
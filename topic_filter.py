@@ -0,0 +1,393 @@
+"""
+Topic Filter for PIXEL BUDDY
+Keyword lexicon compiled once into a word table, so one pass over
+a query finds every soccer, context and other-sport word, plus an
+optional embedding-centroid classifier
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Set
+
+import numpy as np
+
+# Endings accepted after a keyword ("goals", "kicked", "players", "scoring")
+INFLECTIONS = ("s", "es", "d", "ed", "ing", "er", "ers")
+
+# Word separators, hyphens included: "red-card" is looked up as "red" and
+# "card", and a hyphenated keyword ("throw-in") is the phrase "throw in"
+_PUNCTUATION = string.punctuation.encode('ascii')
+PUNCTUATION_TO_SPACE = bytes.maketrans(_PUNCTUATION, b" " * len(_PUNCTUATION))
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets", "topic_lexicon.json")
+LEXICON_CATEGORIES = ("soccer", "context", "other_sports")
+
+
+def load_lexicon(path=DEFAULT_LEXICON_PATH) -> Dict[str, List[str]]:
+    """
+    Load the topic lexicon
+
+    The file maps 'soccer', 'context' (soccer-related only if no other
+    sport is mentioned) and 'other_sports' to keyword lists.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lexicon = json.load(f)
+
+    for category in LEXICON_CATEGORIES:
+        words = lexicon.get(category)
+        if not isinstance(words, list) or not all(isinstance(word, str) and word.strip() for word in words):
+            raise ValueError(f"{path}: '{category}' must be a list of keywords")
+    return lexicon
+
+
+def inflected_forms(word: str, inflections=INFLECTIONS) -> List[str]:
+    """A word and its inflections ("kick" -> "kicks", "kicked", "kicking", ...)"""
+    forms = [word] + [word + ending for ending in inflections]
+    if word.endswith("e"):
+        # score -> scoring, scorer
+        forms += [word[:-1] + ending for ending in inflections if ending[0] in "ei"]
+    elif len(word) > 2 and word[-1] not in "aeiouwy" and word[-2] in "aeiou" and word[-3] not in "aeiou":
+        # win -> winning, winner
+        forms += [word + word[-1] + ending for ending in inflections if ending[0] in "ei"]
+    return forms
+
+
+class TopicMatcher:
+    def __init__(self, lexicon: Dict[str, Iterable[str]], inflections=INFLECTIONS):
+        """
+        Compile a categorized keyword lexicon
+
+        Every keyword is expanded into its inflected forms up front and
+        stored in one table (word -> bitmask of categories), so matching
+        is one dict lookup per query word: whole words only ("ball" does
+        not match "basketball"), case-insensitive, one pass. Multi-word
+        phrases are checked only when their first word occurs in the
+        query. Words are handled as bytes, where lower-casing, punctuation
+        removal and splitting all run in C.
+
+        Args:
+            lexicon: Category name -> keywords / phrases
+            inflections: Endings accepted after a keyword
+        """
+        self.category_names = list(lexicon)
+        self.bits = {category: 1 << i for i, category in enumerate(self.category_names)}
+        self.phrase_bit = 1 << len(self.category_names)
+
+        self.categories = {}  # keyword -> categories it belongs to
+        for category, keywords in lexicon.items():
+            for keyword in keywords:
+                keyword = keyword.lower().replace("-", " ")
+                self.categories.setdefault(keyword, set()).add(category)
+
+        self.table = {}     # inflected word -> category bits (+ phrase_bit for phrase starts)
+        self.keywords = {}  # inflected word -> keywords
+        self.phrases = {}   # first word -> [(padded inflected phrase, keyword)]
+        for keyword, categories in self.categories.items():
+            mask = self.mask_of(categories)
+            *head, last = keyword.encode('utf-8').split()
+            for form in inflected_forms(last.decode('utf-8'), inflections):
+                form = form.encode('utf-8')
+                if head:
+                    self.phrases.setdefault(head[0], []).append((b" %s " % b" ".join(head + [form]), keyword))
+                    self.table[head[0]] = self.table.get(head[0], 0) | self.phrase_bit
+                else:
+                    self.keywords.setdefault(form, []).append(keyword)
+                    self.table[form] = self.table.get(form, 0) | mask
+
+    def mask_of(self, categories: Iterable[str]) -> int:
+        """Bitmask of category names"""
+        mask = 0
+        for category in categories:
+            mask |= self.bits[category]
+        return mask
+
+    def _words(self, text: str) -> List[bytes]:
+        return text.lower().encode('utf-8').translate(PUNCTUATION_TO_SPACE).split()
+
+    def _phrase_hits(self, words: List[bytes]) -> List[str]:
+        padded = b" %s " % b" ".join(words)
+        return [keyword for word in self.phrases.keys() & words
+                for phrase, keyword in self.phrases[word] if phrase in padded]
+
+    def mask(self, text: str) -> int:
+        """Bitmask of the categories with a keyword in text"""
+        words = self._words(text)
+        mask = 0
+        for word in self.table.keys() & words:
+            mask |= self.table[word]
+
+        if mask & self.phrase_bit:
+            mask &= ~self.phrase_bit
+            for keyword in self._phrase_hits(words):
+                mask |= self.mask_of(self.categories[keyword])
+        return mask
+
+    def categories_in(self, text: str) -> Set[str]:
+        """Categories with at least one keyword in text"""
+        mask = self.mask(text)
+        return {category for category, bit in self.bits.items() if mask & bit}
+
+    def hits(self, text: str) -> Dict[str, List[str]]:
+        """Category -> keywords found in text"""
+        words = self._words(text)
+        keywords = [keyword for word in words for keyword in self.keywords.get(word, ())]
+        keywords += self._phrase_hits(words)
+
+        found = {}
+        for keyword in keywords:
+            for category in self.categories[keyword]:
+                found.setdefault(category, []).append(keyword)
+        return found
+
+
+class TopicFilter:
+    def __init__(self, lexicon: Dict[str, Iterable[str]] = None):
+        """
+        Decide whether a query is about soccer
+
+        Args:
+            lexicon: 'soccer', 'context' and 'other_sports' keyword lists
+                (default: loaded from DEFAULT_LEXICON_PATH)
+        """
+        self.set_lexicon(lexicon or load_lexicon())
+
+    def set_lexicon(self, lexicon: Dict[str, Iterable[str]]):
+        """
+        Compile a new lexicon and swap it in
+
+        The matcher is built first and then replaced with a single
+        assignment, so concurrent queries see either the old or the new
+        lexicon, never a mix.
+        """
+        self.matcher = TopicMatcher(lexicon)
+
+    def is_soccer_related(self, query: str) -> bool:
+        """
+        A soccer keyword, or a context word (score, win, ...) without
+        another sport being mentioned
+        """
+        matcher = self.matcher
+        bits = matcher.bits
+        mask = matcher.mask(query)
+        if mask & bits.get("soccer", 0):
+            return True
+        return bool(mask & bits.get("context", 0)) and not mask & bits.get("other_sports", 0)
+
+
+class LexiconWatcher:
+    def __init__(self, path, on_change: Callable[[Dict[str, List[str]]], None], interval=2.0):
+        """
+        Reload a lexicon file when it changes
+
+        A daemon thread polls the file's modification time and size. A
+        changed file is loaded and validated before on_change is called;
+        a broken file is reported and the current lexicon stays active.
+
+        Args:
+            path: Lexicon JSON file
+            on_change: Called with the newly loaded lexicon
+            interval: Seconds between checks
+        """
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.reloads = 0
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self) -> bool:
+        """Reload now if the file changed; True if a new lexicon was applied"""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+
+        try:
+            lexicon = load_lexicon(self.path)
+            self.on_change(lexicon)
+        except Exception as e:
+            print(f"⚠️  Topic lexicon not reloaded, keeping the current one: {e}")
+            return False
+
+        self.reloads += 1
+        print(f"🔄 Topic lexicon reloaded ({sum(len(words) for words in lexicon.values())} keywords)")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+# Prototype questions for the embedding classifier
+SOCCER_EXAMPLES = [
+    "What is the offside rule in soccer?",
+    "When is a penalty kick awarded?",
+    "How long does a football match last?",
+    "What does a yellow card mean?",
+    "How many players are on a soccer team?",
+    "Who won the last World Cup?",
+    "Who is the best striker in the Premier League?",
+    "What does the goalkeeper do?",
+    "How does extra time work in a knockout game?",
+    "What formation does the national team play?",
+    "When can the referee stop the game?",
+    "How big is a football pitch?",
+    "What is a free kick?",
+    "Which club has won the most Champions League titles?",
+    "Tell me about Lionel Messi's career",
+    "Why was the goal disallowed by VAR?",
+]
+
+OFF_TOPIC_EXAMPLES = [
+    "What is the capital of France?",
+    "How do I cook pasta?",
+    "What is Python programming?",
+    "What's the weather like tomorrow?",
+    "How do I fix my computer?",
+    "Explain quantum physics",
+    "Recommend a good movie",
+    "How does the stock market work?",
+    "Who won the NBA finals in basketball?",
+    "What are the rules of tennis?",
+    "How do I learn to play the guitar?",
+    "What should I eat for dinner?",
+    "Help me with my math homework",
+    "Who was the first president of the United States?",
+    "How many calories are in an apple?",
+    "What is the best phone to buy?",
+]
+
+
+def _unit(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class CentroidClassifier:
+    def __init__(self, embed_many: Callable[[List[str]], List[List[float]]],
+                 positive: List[str] = None, negative: List[str] = None, margin=0.0):
+        """
+        Topic classifier on sentence embeddings
+
+        The prototype questions are embedded once and averaged into a
+        soccer and an off-topic centroid. A query is soccer-related when
+        its vector is closer to the soccer centroid by more than margin,
+        so the check itself is two dot products on a vector retrieval
+        needs anyway.
+
+        Args:
+            embed_many: Embeds a list of texts (e.g. embed_documents)
+            positive: Soccer prototype questions
+            negative: Off-topic prototype questions
+            margin: Required similarity lead of the soccer centroid
+        """
+        positive = positive or SOCCER_EXAMPLES
+        negative = negative or OFF_TOPIC_EXAMPLES
+        vectors = _unit(embed_many(positive + negative))
+        self.centroids = _unit(np.stack([
+            vectors[:len(positive)].mean(axis=0),
+            vectors[len(positive):].mean(axis=0)
+        ]))
+        self.margin = margin
+
+    def score(self, vector) -> float:
+        """Similarity to the soccer centroid minus similarity to the off-topic one"""
+        soccer, off_topic = self.centroids @ _unit(vector)
+        return float(soccer - off_topic)
+
+    def is_soccer_related(self, vector) -> bool:
+        return self.score(vector) > self.margin
+
+
+def legacy_is_soccer_related(query: str, lexicon) -> bool:
+    """Previous substring scan, kept for the benchmark"""
+    query_lower = query.lower()
+    for keyword in lexicon["soccer"]:
+        if keyword in query_lower:
+            return True
+    for word in lexicon["context"]:
+        if word in query_lower:
+            if not any(sport in query_lower for sport in lexicon["other_sports"]):
+                return True
+    return False
+
+
+def benchmark_corpus(size: int, seed=0) -> List[str]:
+    """Mix of soccer and off-topic questions built from templates"""
+    rng = random.Random(seed)
+    lexicon = load_lexicon()
+    subjects = lexicon["soccer"] + lexicon["other_sports"] + [
+        'python', 'pasta', 'the weather', 'quantum physics', 'my homework',
+        'the stock market', 'a good movie', 'various options', 'basketball players'
+    ]
+    templates = [
+        "What is {}?", "Tell me about {}", "How does {} work in practice?",
+        "Can you explain {} to a beginner please", "Why do people care about {} so much?",
+        "I was reading about {} yesterday and wondered what the history of it is"
+    ]
+    return [rng.choice(templates).format(rng.choice(subjects)) for _ in range(size)]
+
+
+def synthetic_keywords(count: int, seed=0) -> List[str]:
+    """Made-up names standing in for a grown lexicon (players, clubs, stadiums)"""
+    rng = random.Random(seed)
+    syllables = ['ka', 'lo', 'mi', 'ran', 'do', 'vel', 'zu', 'ter', 'bo', 'sen', 'ar', 'qui']
+    return [''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) + 'x' for _ in range(count)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the compiled topic filter")
+    parser.add_argument("--queries", type=int, default=100000)
+    parser.add_argument("--extra-keywords", type=int, default=1000,
+                        help="Synthetic keywords for the grown-lexicon run")
+    args = parser.parse_args()
+
+    queries = benchmark_corpus(args.queries)
+    lexicon = load_lexicon()
+    grown = dict(lexicon, soccer=lexicon["soccer"] + synthetic_keywords(args.extra_keywords))
+
+    print(f"📊 Benchmark: {len(queries)} queries\n")
+
+    for name, words in [("Default lexicon", lexicon), (f"+{args.extra_keywords} keywords", grown)]:
+        topic_filter = TopicFilter(words)
+
+        start = time.perf_counter()
+        legacy = [legacy_is_soccer_related(q, words) for q in queries]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        compiled = [topic_filter.is_soccer_related(q) for q in queries]
+        compiled_time = time.perf_counter() - start
+
+        print(f"   {name} ({sum(len(keywords) for keywords in words.values())} entries)")
+        print(f"      Substring scan:  {legacy_time / len(queries) * 1e6:7.2f} µs/query")
+        print(f"      Compiled table:  {compiled_time / len(queries) * 1e6:7.2f} µs/query "
+              f"({legacy_time / compiled_time:.1f}x)")
+
+    topic_filter = TopicFilter()
+    changed = sorted({q for q in queries if legacy_is_soccer_related(q, lexicon) != topic_filter.is_soccer_related(q)})
+    print(f"\n🔍 {len(changed)} distinct queries decided differently (word boundaries), e.g.:")
+    for query in changed[:8]:
+        print(f"   {'Soccer' if topic_filter.is_soccer_related(query) else 'Not soccer':10s} <- {query}")
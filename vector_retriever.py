@@ -0,0 +1,265 @@
+"""
+In-Memory Vector Retriever for PIXEL BUDDY
+Pure-NumPy alternative to Chroma for small knowledge bases
+"""
+
+import argparse
+import itertools
+import time
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+SCORE_BLOCK_ROWS = 1024
+
+
+class Chunk:
+    """Lightweight stand-in for a langchain Document"""
+    __slots__ = ("page_content", "metadata")
+
+    def __init__(self, page_content: str, metadata: Dict):
+        self.page_content = page_content
+        self.metadata = metadata
+
+    def __repr__(self):
+        return f"Chunk(source={self.metadata.get('source')!r}, chars={len(self.page_content)})"
+
+
+def normalize(vectors) -> np.ndarray:
+    """L2-normalize row vectors as contiguous float32"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms)
+
+
+def quantize(vectors: np.ndarray, precision: str):
+    """
+    Convert normalized float32 vectors to the storage precision
+
+    Returns (matrix, scales). For int8 every row gets its own scale
+    (max |value| / 127), for the float types scales is None.
+    """
+    if precision == "float32":
+        return vectors, None
+    if precision == "float16":
+        return vectors.astype(np.float16), None
+    if precision == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        matrix = np.round(vectors / scales[:, None]).astype(np.int8)
+        return matrix, scales.astype(np.float32)
+    raise ValueError(f"Unknown precision: {precision} (use one of {PRECISIONS})")
+
+
+class NumpyVectorStore:
+    def __init__(self, embedding, precision="float32"):
+        """
+        Initialize an empty store
+
+        All chunk embeddings are kept normalized in one contiguous
+        matrix, so a search is a single matrix-vector product. The
+        matrix can be stored as float16, or int8 with per-row scales,
+        to cut memory; scoring then runs block-wise on the quantized rows.
+
+        Args:
+            embedding: Embedding function (embed_documents / embed_query)
+            precision: 'float32', 'float16' or 'int8'
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision} (use one of {PRECISIONS})")
+
+        self.embedding = embedding
+        self.precision = precision
+        self.docs = []
+        self.matrix = None
+        self.scales = None
+
+    @classmethod
+    def from_texts(cls, chunks: Iterable[Tuple[str, Dict]], embedding, batch_size=64, precision="float32"):
+        """
+        Build a store from (text, metadata) pairs
+
+        Args:
+            chunks: Chunks to index (a list or a stream, e.g. iter_document_chunks)
+            embedding: Embedding function
+            batch_size: Texts per embedding call
+            precision: Storage precision of the embedding matrix
+        """
+        store = cls(embedding, precision=precision)
+        chunks = iter(chunks)
+        while True:
+            batch = list(itertools.islice(chunks, batch_size))
+            if not batch:
+                break
+            store.add_texts([text for text, _ in batch], [metadata for _, metadata in batch])
+        return store
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add_texts(self, texts: List[str], metadatas: List[Dict] = None):
+        """Embed and append texts to the store"""
+        if not texts:
+            return
+
+        metadatas = metadatas or [{} for _ in texts]
+        self.add_vectors(self.embedding.embed_documents(list(texts)),
+                         [Chunk(text, metadata) for text, metadata in zip(texts, metadatas)])
+
+    def add_vectors(self, vectors, docs: List[Chunk]):
+        """Append precomputed embeddings for docs"""
+        matrix, scales = quantize(normalize(vectors), self.precision)
+
+        self.docs.extend(docs)
+        if self.matrix is None:
+            self.matrix, self.scales = matrix, scales
+        else:
+            self.matrix = np.ascontiguousarray(np.vstack([self.matrix, matrix]))
+            if scales is not None:
+                self.scales = np.concatenate([self.scales, scales])
+
+    @property
+    def nbytes(self):
+        """Memory used by the embedding matrix"""
+        if self.matrix is None:
+            return 0
+        return self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def _score_matrix(self, queries: np.ndarray) -> np.ndarray:
+        """(num_queries, num_chunks) similarities for normalized float32 queries"""
+        if self.precision == "float32":
+            return queries @ self.matrix.T
+
+        # Quantized rows are widened one block at a time to bound the temporary
+        scores = np.empty((queries.shape[0], self.matrix.shape[0]), dtype=np.float32)
+        for start in range(0, self.matrix.shape[0], SCORE_BLOCK_ROWS):
+            block = self.matrix[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    def score(self, query_vector) -> np.ndarray:
+        """Cosine similarity of one query vector against every chunk"""
+        return self._score_matrix(normalize(query_vector)[None, :])[0]
+
+    def _top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k best scores, best first"""
+        k = min(k, scores.shape[-1])
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        if k < scores.shape[-1]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[-1])
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k=4):
+        """Return [(chunk, score)] for a precomputed query embedding"""
+        if not self.docs:
+            return []
+        scores = self.score(embedding)
+        return [(self.docs[i], float(scores[i])) for i in self._top_k(scores, k)]
+
+    def similarity_search_by_vector(self, embedding, k=4):
+        """Return the k chunks closest to a precomputed query embedding"""
+        return [doc for doc, _ in self.similarity_search_by_vector_with_relevance_scores(embedding, k)]
+
+    def similarity_search_with_relevance_scores(self, query: str, k=4):
+        """Return [(chunk, score)] for a text query"""
+        return self.similarity_search_by_vector_with_relevance_scores(
+            self.embedding.embed_query(query), k
+        )
+
+    def similarity_search(self, query: str, k=4):
+        """Return the k chunks closest to a text query"""
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k)
+
+    def batch_search_by_vector(self, embeddings, k=4):
+        """
+        Search many query embeddings with one matrix product
+
+        Args:
+            embeddings: (num_queries, dim) query embeddings
+            k: Chunks per query
+
+        Returns:
+            One list of (chunk, score) per query, in input order
+        """
+        if not self.docs:
+            return [[] for _ in range(len(embeddings))]
+
+        scores = self._score_matrix(normalize(embeddings))
+        k = min(k, scores.shape[1])
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+
+        rows = np.arange(scores.shape[0])[:, None]
+        order = np.argsort(-scores[rows, candidates], axis=1, kind="stable")
+        best = candidates[rows, order]
+
+        return [
+            [(self.docs[i], float(scores[q, i])) for i in best[q]]
+            for q in range(scores.shape[0])
+        ]
+
+    def batch_search(self, queries: List[str], k=4):
+        """Search many text queries at once"""
+        if hasattr(self.embedding, 'embed_queries'):
+            vectors = self.embedding.embed_queries(list(queries))
+        else:
+            vectors = [self.embedding.embed_query(q) for q in queries]
+        return self.batch_search_by_vector(vectors, k)
+
+
+def measure_recall(reference: NumpyVectorStore, candidate: NumpyVectorStore, query_vectors, k=3) -> float:
+    """
+    Recall@k of a reduced-precision store against a float32 reference
+
+    Both stores must hold the same chunks in the same order.
+    """
+    reference_hits = reference.batch_search_by_vector(query_vectors, k=k)
+    candidate_hits = candidate.batch_search_by_vector(query_vectors, k=k)
+
+    found = 0
+    for expected, got in zip(reference_hits, candidate_hits):
+        expected_ids = {id(doc) for doc, _ in expected}
+        found += sum(id(doc) in expected_ids for doc, _ in got)
+    return found / (k * len(reference_hits)) if reference_hits else 1.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall and memory of reduced-precision indexes")
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    # Clustered synthetic embeddings roughly shaped like MiniLM output
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((256, args.dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, 256, args.chunks)] + 0.6 * rng.standard_normal((args.chunks, args.dim)).astype(np.float32)
+    queries = vectors[rng.integers(0, args.chunks, args.queries)] + 0.4 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    docs = [Chunk(f"chunk {i}", {}) for i in range(args.chunks)]
+
+    print(f"📊 {args.chunks} chunks x {args.dim} dims, {args.queries} queries, k={args.k}\n")
+
+    reference = None
+    for precision in PRECISIONS:
+        store = NumpyVectorStore(embedding=None, precision=precision)
+        store.add_vectors(vectors, docs)
+        reference = reference or store
+
+        start = time.perf_counter()
+        for query in queries[:100]:
+            store.similarity_search_by_vector(query, k=args.k)
+        latency = (time.perf_counter() - start) / 100
+
+        recall = measure_recall(reference, store, queries, k=args.k)
+        print(f"   {precision:8s} memory {store.nbytes / 2**20:7.1f} MB   "
+              f"recall@{args.k} {recall:.4f}   {latency * 1e3:.2f} ms/query")